@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Activity Store
+Per-session activity records for notify-ntfy.py.
+
+Each session is kept in its own .claude/hooks/sessions/<session_id>.json, so
+an event reads and rewrites one session instead of every session the project
+has ever seen. Updates hold an flock on the session's lock file for the whole
+read-modify-write and replace the file atomically, so concurrent subagent
+hooks neither lose each other's updates nor leave half-written JSON behind.
+
+Set ACTIVITY_STORE=sqlite to keep activity in .claude/hooks/activity.db
+instead: a WAL-mode SQLite database with indexed tables for sessions,
+prompts, files and agents. Each event is one small upsert transaction, and
+cleanup is a single indexed DELETE on last_activity.
+
+Hooks use get_store(), whose record() / load() / cleanup() behave the same
+for both backends; load() returns the session dict notify-ntfy.py reads.
+
+files_edited, files_created and agents_launched are insertion-ordered sets
+with bounded storage: the session dict holds the RECENT_WINDOW most recently
+added names plus an exact `<field>_count`. Membership lives outside the
+shard, in <session_id>.seen: a fixed-size open-addressing table of 64-bit
+blake2b digests in a sparse file. A lookup reads a slot or two and a new
+name writes one 8-byte slot in place, so the per-event cost and the shard
+size no longer grow with the number of files a session has touched.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import struct
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# "json" (one file per session) or "sqlite"
+ACTIVITY_STORE = os.environ.get('ACTIVITY_STORE', 'json')
+
+# Sessions idle for longer than this are removed on SessionStart
+MAX_AGE_DAYS = 7
+
+# Prompts kept per session
+PROMPT_HISTORY = 5
+
+# Names kept per activity set
+RECENT_WINDOW = 10
+
+# Slots in a session's .seen table, shared by all its activity sets; counts
+# stay exact until the table is full (kept under ~60% load for short probes)
+SEEN_SLOTS = 32768
+SEEN_MAX_ENTRIES = 20000
+
+ACTIVITY_SETS = ('files_edited', 'files_created', 'agents_launched')
+
+
+def get_sessions_dir() -> str:
+    return os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude', 'hooks', 'sessions')
+
+def get_database_path() -> str:
+    return os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude', 'hooks', 'activity.db')
+
+def get_legacy_path() -> str:
+    """The single session_activity.json used before sessions were sharded"""
+    return os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude', 'hooks', 'session_activity.json')
+
+def session_path(session_id: str) -> str:
+    """Shard path for a session; ids are reduced to filename-safe characters"""
+    safe_id = ''.join(c if c.isalnum() or c in '-_' else '_' for c in session_id)
+    return os.path.join(get_sessions_dir(), f"{safe_id}.json")
+
+def seen_path(session_id: str) -> str:
+    """Membership table for a session's activity sets"""
+    return session_path(session_id)[:-len('.json')] + '.seen'
+
+
+def new_session() -> dict:
+    return {
+        'files_edited': [],
+        'files_edited_count': 0,
+        'files_created': [],
+        'files_created_count': 0,
+        'commands_run': 0,
+        'agents_launched': [],
+        'agents_launched_count': 0,
+        'last_prompt': '',
+        'all_prompts': [],
+        'last_activity': datetime.now().isoformat()
+    }
+
+def load_session(session_id: str) -> dict:
+    """Return the stored activity for a session, or {} if there is none"""
+    try:
+        with open(session_path(session_id), 'r') as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return session if isinstance(session, dict) else {}
+
+def write_atomic(path: str, session: dict) -> None:
+    """Replace a shard so readers never see a partial write"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(session, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def member_digest(field: str, name: str) -> int:
+    """Non-zero 64-bit digest of a set member (zero marks an empty slot)"""
+    from hashlib import blake2b  # Only needed when a set actually changes
+
+    digest = int.from_bytes(blake2b(f"{field}\0{name}".encode('utf-8'), digest_size=8).digest(), 'little')
+    return digest or 1
+
+
+class SeenTable:
+    """
+    Fixed-size hash set of 64-bit digests stored in a sparse file.
+    Callers serialize access (update_session holds the session lock).
+    """
+
+    def __init__(self, path: str, slots: int = SEEN_SLOTS):
+        self.path = path
+        self.slots = slots
+        self.fd: int | None = None
+
+    def _open(self) -> int:
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(self.fd).st_size < (self.slots + 1) * 8:
+                # Slot 0 of the file is the entry count; the rest stay holes until used
+                os.ftruncate(self.fd, (self.slots + 1) * 8)
+        return self.fd
+
+    def add(self, digest: int) -> bool | None:
+        """True if newly added, False if already present, None if the table is full"""
+        fd = self._open()
+        (entries,) = struct.unpack('<Q', os.pread(fd, 8, 0))
+
+        slot = digest % self.slots
+        for _ in range(self.slots):
+            (stored,) = struct.unpack('<Q', os.pread(fd, 8, (slot + 1) * 8))
+            if stored == digest:
+                return False
+            if stored == 0:
+                if entries >= SEEN_MAX_ENTRIES:
+                    return None
+                os.pwrite(fd, struct.pack('<Q', digest), (slot + 1) * 8)
+                os.pwrite(fd, struct.pack('<Q', entries + 1), 0)
+                return True
+            slot = (slot + 1) % self.slots
+        return None
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ActivitySet:
+    """Insertion-ordered set of names with an exact count and a bounded recent window"""
+
+    def __init__(self, field: str, recent: list[str], count: int, seen: SeenTable):
+        self.field = field
+        self.recent = list(recent)
+        self.count = count
+        self.seen = seen
+
+    @classmethod
+    def from_session(cls, session: dict, field: str, seen: SeenTable) -> 'ActivitySet':
+        recent = session.get(field, [])
+        count = session.get(f'{field}_count')
+        if count is None:
+            # Shards written before counts were kept hold the full name list
+            for name in recent:
+                seen.add(member_digest(field, name))
+            count = len(recent)
+        return cls(field, recent[-RECENT_WINDOW:], count, seen)
+
+    def add(self, name: str) -> bool:
+        """Add a name; returns False if it was already a member"""
+        added = self.seen.add(member_digest(self.field, name))
+        if added is False:
+            return False
+        if added is None and name in self.recent:
+            # With the table full only the recent window is checked, so counts may run high
+            return False
+
+        self.count += 1
+        self.recent.append(name)
+        del self.recent[:-RECENT_WINDOW]
+        return True
+
+    def store(self, session: dict) -> None:
+        session[self.field] = self.recent
+        session[f'{self.field}_count'] = self.count
+
+
+def apply_change(session: dict, kind: str, value: str | None = None,
+                 seen: SeenTable | None = None) -> None:
+    """
+    Apply one recorded change (prompt, file_edited, file_created, command, agent).
+    seen is the session's membership table, needed for the set changes.
+    """
+    if kind == 'prompt':
+        session['last_prompt'] = value
+        session['all_prompts'] = (session.get('all_prompts', []) + [value])[-PROMPT_HISTORY:]
+    elif kind in ('file_edited', 'file_created', 'agent'):
+        field = 'agents_launched' if kind == 'agent' else kind.replace('file_', 'files_')
+        members = ActivitySet.from_session(session, field, seen)
+        members.add(value)
+        members.store(session)
+    elif kind == 'command':
+        session['commands_run'] += 1
+
+
+@contextmanager
+def update_session(session_id: str) -> Iterator[dict]:
+    """
+    Yield a session's activity for modification and save it afterwards.
+    Concurrent updates of the same session are serialized; nothing is
+    written if the with-block raises.
+    """
+    path = session_path(session_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path + '.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        stored = load_session(session_id)
+        session = new_session()
+        session.update(stored)
+        # Digests used to be kept inline; they now live in the .seen table
+        session.pop('seen', None)
+        for field in ACTIVITY_SETS:
+            if f'{field}_count' not in stored:
+                # Left for ActivitySet.from_session to count and index
+                del session[f'{field}_count']
+
+        yield session
+
+        session['last_activity'] = datetime.now().isoformat()
+        write_atomic(path, session)
+
+
+def migrate_legacy() -> int:
+    """Split an old session_activity.json into shards; returns sessions moved"""
+    legacy_path = get_legacy_path()
+    try:
+        with open(legacy_path, 'r') as f:
+            sessions = json.load(f)
+    except (OSError, ValueError):
+        return 0
+
+    moved = 0
+    if isinstance(sessions, dict):
+        for session_id, data in sessions.items():
+            if not isinstance(data, dict) or os.path.exists(session_path(session_id)):
+                continue
+            os.makedirs(get_sessions_dir(), exist_ok=True)
+            write_atomic(session_path(session_id), data)
+            moved += 1
+
+            # Carry the recorded last activity over so cleanup ages the shard correctly
+            try:
+                last_activity = datetime.fromisoformat(data.get('last_activity', '')).timestamp()
+                os.utime(session_path(session_id), (last_activity, last_activity))
+            except (TypeError, ValueError):
+                pass
+
+    os.remove(legacy_path)
+    return moved
+
+def cleanup_sessions(max_age_days: int = MAX_AGE_DAYS) -> int:
+    """Remove sessions idle for max_age_days; returns the number removed"""
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    try:
+        names = os.listdir(get_sessions_dir())
+    except FileNotFoundError:
+        return 0
+
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(get_sessions_dir(), name)
+        try:
+            # Every update rewrites the shard, so its mtime is the last activity
+            if os.path.getmtime(path) >= cutoff:
+                continue
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            continue
+        for extra_path in (path[:-len('.json')] + '.seen', path + '.lock'):
+            try:
+                os.remove(extra_path)
+            except FileNotFoundError:
+                pass
+
+    return removed
+
+
+class JsonActivityStore:
+    """One JSON file per session"""
+
+    def record(self, session_id: str, kind: str | None = None, value: str | None = None) -> dict:
+        """Record one change (or just activity if kind is None); returns the session"""
+        seen = SeenTable(seen_path(session_id))
+        try:
+            with update_session(session_id) as session:
+                if kind:
+                    apply_change(session, kind, value, seen)
+        finally:
+            seen.close()
+        return session
+
+    def load(self, session_id: str) -> dict:
+        session = load_session(session_id)
+        session.pop('seen', None)
+        for field in ACTIVITY_SETS:
+            if field in session:
+                session.setdefault(f'{field}_count', len(session[field]))
+        return session
+
+    def cleanup(self, max_age_days: int = MAX_AGE_DAYS) -> int:
+        migrate_legacy()
+        return cleanup_sessions(max_age_days)
+
+
+class SqliteActivityStore:
+    """All sessions in one WAL-mode SQLite database"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            commands_run INTEGER NOT NULL DEFAULT 0,
+            last_prompt TEXT NOT NULL DEFAULT '',
+            last_activity TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_last_activity ON sessions (last_activity);
+
+        CREATE TABLE IF NOT EXISTS prompts (
+            id INTEGER PRIMARY KEY,
+            session_id TEXT NOT NULL REFERENCES sessions ON DELETE CASCADE,
+            prompt TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS prompts_session ON prompts (session_id, id);
+
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY,
+            session_id TEXT NOT NULL REFERENCES sessions ON DELETE CASCADE,
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL,
+            UNIQUE (session_id, kind, name)
+        );
+
+        CREATE TABLE IF NOT EXISTS agents (
+            id INTEGER PRIMARY KEY,
+            session_id TEXT NOT NULL REFERENCES sessions ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            UNIQUE (session_id, name)
+        );
+    """
+
+    def __init__(self, path: str | None = None):
+        import sqlite3  # Only paid for when this backend is selected
+
+        self.path = path or get_database_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # The timeout is SQLite's busy wait for concurrent hook writers
+        self.connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(self.SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator:
+        """Take the write lock up front so concurrent writers queue instead of failing"""
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+    def record(self, session_id: str, kind: str | None = None, value: str | None = None) -> dict:
+        """Record one change (or just activity if kind is None); returns the session"""
+        now = datetime.now().isoformat()
+        with self.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO sessions (session_id, last_activity) VALUES (?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET last_activity = excluded.last_activity",
+                (session_id, now)
+            )
+
+            if kind == 'prompt':
+                cursor.execute("UPDATE sessions SET last_prompt = ? WHERE session_id = ?", (value, session_id))
+                cursor.execute("INSERT INTO prompts (session_id, prompt) VALUES (?, ?)", (session_id, value))
+                cursor.execute(
+                    "DELETE FROM prompts WHERE session_id = ? AND id NOT IN "
+                    "(SELECT id FROM prompts WHERE session_id = ? ORDER BY id DESC LIMIT ?)",
+                    (session_id, session_id, PROMPT_HISTORY)
+                )
+            elif kind in ('file_edited', 'file_created'):
+                cursor.execute(
+                    "INSERT OR IGNORE INTO files (session_id, kind, name) VALUES (?, ?, ?)",
+                    (session_id, kind, value)
+                )
+            elif kind == 'command':
+                cursor.execute(
+                    "UPDATE sessions SET commands_run = commands_run + 1 WHERE session_id = ?", (session_id,)
+                )
+            elif kind == 'agent':
+                cursor.execute(
+                    "INSERT OR IGNORE INTO agents (session_id, name) VALUES (?, ?)", (session_id, value)
+                )
+
+        return self.load(session_id)
+
+    def load(self, session_id: str) -> dict:
+        """Return the stored activity for a session, or {} if there is none"""
+        execute = self.connection.execute
+        row = execute(
+            "SELECT commands_run, last_prompt, last_activity FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return {}
+
+        def recent(query, *args):
+            # Newest RECENT_WINDOW rows, returned oldest first
+            rows = execute(f"{query} ORDER BY id DESC LIMIT ?", (session_id, *args, RECENT_WINDOW))
+            return [name for (name,) in rows][::-1]
+
+        file_counts = dict(execute(
+            "SELECT kind, COUNT(*) FROM files WHERE session_id = ? GROUP BY kind", (session_id,)
+        ))
+        files_query = "SELECT name FROM files WHERE session_id = ? AND kind = ?"
+        agents_query = "SELECT name FROM agents WHERE session_id = ?"
+        return {
+            'files_edited': recent(files_query, 'file_edited'),
+            'files_edited_count': file_counts.get('file_edited', 0),
+            'files_created': recent(files_query, 'file_created'),
+            'files_created_count': file_counts.get('file_created', 0),
+            'commands_run': row[0],
+            'agents_launched': recent(agents_query),
+            'agents_launched_count': execute(
+                "SELECT COUNT(*) FROM agents WHERE session_id = ?", (session_id,)
+            ).fetchone()[0],
+            'last_prompt': row[1],
+            'all_prompts': [prompt for (prompt,) in execute(
+                "SELECT prompt FROM prompts WHERE session_id = ? ORDER BY id", (session_id,))],
+            'last_activity': row[2]
+        }
+
+    def cleanup(self, max_age_days: int = MAX_AGE_DAYS) -> int:
+        """Remove sessions idle for max_age_days; their rows cascade"""
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self.transaction() as cursor:
+            cursor.execute("DELETE FROM sessions WHERE last_activity < ?", (cutoff,))
+            return cursor.rowcount
+
+
+_store = None
+
+def get_store():
+    """The backend selected by ACTIVITY_STORE, created on first use"""
+    global _store
+    if _store is None:
+        _store = SqliteActivityStore() if ACTIVITY_STORE == 'sqlite' else JsonActivityStore()
+    return _store
@@ -5,49 +5,72 @@ Automatically tracks file changes and logs them to .claude/logs/CHANGELOG.md
 
 This hook monitors file creation, modification, and deletion events
 and appends entries to the changelog in the proper format.
+
+Entries are appended to .claude/logs/changelog.jsonl and folded into the
+newest-first CHANGELOG.md on Stop/SubagentStop, or on demand with --render.
+Set CHANGELOG_STORAGE=markdown to rewrite CHANGELOG.md on every edit instead.
 """
 
+from __future__ import annotations
+
 import json
 import sys
 import os
-import datetime
 import re
-from pathlib import Path
-from typing import Dict, Optional, Tuple
+import time
+
+# datetime, fcntl, pathlib and journal are imported once an event is known
+# to be relevant, so other tools' events stay cheap
+
+# Storage mode: "journal" appends one JSONL record per edit and renders
+# CHANGELOG.md on Stop/SubagentStop; "markdown" rewrites CHANGELOG.md every edit
+CHANGELOG_STORAGE = os.environ.get('CHANGELOG_STORAGE', 'journal')
+
+# Slots in the per-day duplicate index; a new entry evicts whichever older
+# entry shares its slot, so the index never grows past DEDUP_SLOTS * 8 bytes
+DEDUP_SLOTS = 8192
+
+# Created by start_metrics() once an event turns out to be relevant, so
+# irrelevant events never import hook_metrics
+metrics = None
+STARTED = time.perf_counter()
+
+def start_metrics():
+    """Return this hook's HookMetrics, importing hook_metrics on first use"""
+    global metrics
+    if metrics is None:
+        from hook_metrics import HookMetrics
+        metrics = HookMetrics("change-log", STARTED)
+    return metrics
 
 def extract_agent_name(transcript_path: str) -> str:
     """Extract agent name from transcript or session context."""
+    from transcript_reader import iter_records_reverse
+
     try:
-        if os.path.exists(transcript_path):
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                # Read the last few lines to find agent context
-                lines = f.readlines()
-                for line in reversed(lines[-20:]):  # Check last 20 lines
-                    try:
-                        data = json.loads(line.strip())
-                        if 'role' in data and data['role'] == 'assistant':
-                            # Look for agent mentions in content
-                            content = data.get('content', '')
-                            if 'subagent' in content.lower() or 'agent' in content.lower():
-                                # Extract agent name patterns
-                                agent_patterns = [
-                                    r'@([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
-                                    r'agent:\s*([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
-                                    r'using\s+([a-zA-Z-]+(?:-[a-zA-Z]+)*)\s+agent'
-                                ]
-                                for pattern in agent_patterns:
-                                    match = re.search(pattern, content, re.IGNORECASE)
-                                    if match:
-                                        return match.group(1).lower()
-                    except (json.JSONDecodeError, KeyError):
-                        continue
+        # Walk the transcript backwards from EOF; only the tail is ever read
+        for data in iter_records_reverse(transcript_path, max_lines=20):  # Check last 20 lines
+            if 'role' in data and data['role'] == 'assistant':
+                # Look for agent mentions in content
+                content = data.get('content', '')
+                if 'subagent' in content.lower() or 'agent' in content.lower():
+                    # Extract agent name patterns
+                    agent_patterns = [
+                        r'@([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
+                        r'agent:\s*([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
+                        r'using\s+([a-zA-Z-]+(?:-[a-zA-Z]+)*)\s+agent'
+                    ]
+                    for pattern in agent_patterns:
+                        match = re.search(pattern, content, re.IGNORECASE)
+                        if match:
+                            return match.group(1).lower()
     except Exception:
         pass
 
     return "main-agent"
 
 
-def determine_change_type(tool_name: str, file_path: str, tool_input: Dict) -> str:
+def determine_change_type(tool_name: str, file_path: str, tool_input: dict) -> str:
     """Determine the type of change based on tool and context."""
     file_path_lower = file_path.lower()
 
@@ -82,6 +105,8 @@ def determine_change_type(tool_name: str, file_path: str, tool_input: Dict) -> s
 
 def generate_description(tool_name: str, file_path: str, change_type: str) -> str:
     """Generate a meaningful description based on file path and change type."""
+    from pathlib import Path
+
     path_obj = Path(file_path)
     file_name = path_obj.name
     parent_dir = path_obj.parent.name if path_obj.parent.name != "." else ""
@@ -145,7 +170,7 @@ def generate_description(tool_name: str, file_path: str, change_type: str) -> st
         return f"Modified {component_type}"
 
 
-def read_existing_changelog(changelog_path: str) -> Tuple[str, str]:
+def read_existing_changelog(changelog_path: str) -> tuple[str, str]:
     """Read existing changelog and return header and entries sections."""
     if not os.path.exists(changelog_path):
         # Create basic structure if file doesn't exist
@@ -197,61 +222,139 @@ TIME | TYPE | DESCRIPTION | FILE_PATH | AGENT
         return "", ""
 
 
-def get_today_section_line(entries: str) -> Optional[int]:
-    """Find the line number of today's date section in the entries."""
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    lines = entries.split('\n')
-
+def get_date_section_line(lines: list[str], date_str: str) -> int | None:
+    """Find the line number of a date section in the entries."""
     for i, line in enumerate(lines):
-        if line.strip() == f"### {today}":
+        if line.strip() == f"### {date_str}":
             return i
 
     return None
 
 
+def insert_entry_line(lines: list[str], date_str: str, entry: str) -> None:
+    """Insert an entry at the top of its date section (descending order)."""
+    section_line = get_date_section_line(lines, date_str)
+
+    if section_line is not None:
+        # Date section exists, insert entry right after the date header
+        # Skip blank lines after the header
+        insert_idx = section_line + 1
+        while insert_idx < len(lines) and lines[insert_idx].strip() == "":
+            insert_idx += 1
+        lines.insert(insert_idx, f"- {entry}")
+    else:
+        # Create new section for the date at the top
+        # Find where to insert (skip initial blank lines)
+        insert_idx = 0
+        while insert_idx < len(lines) and lines[insert_idx].strip() == "":
+            insert_idx += 1
+
+        # Insert new date section at the top
+        new_section = ["\n", f"### {date_str}", "", f"- {entry}"]
+        for item in reversed(new_section):
+            lines.insert(insert_idx, item)
+
+
+def write_changelog(changelog_path: str, header: str, lines: list[str]) -> None:
+    """Write the rendered changelog back to disk."""
+    new_content = header + '\n'.join(lines)
+
+    # Ensure parent directory exists
+    os.makedirs(os.path.dirname(changelog_path), exist_ok=True)
+
+    with open(changelog_path, 'w', encoding='utf-8') as f:
+        f.write(new_content)
+
+
+def format_changelog_entry(record: dict) -> str:
+    """Format a journal record as a changelog line."""
+    return f"{record['time']} | {record['type']} | {record['description']} | `{record['file']}` | {record['agent']}"
+
+
+def entry_hash(entry: str) -> bytes:
+    """Return a short stable hash of a changelog entry (never all zero bytes)."""
+    import hashlib
+    digest = hashlib.blake2b(entry.strip().encode('utf-8'), digest_size=8).digest()
+    # All-zero slots are empty
+    return digest if any(digest) else b'\0' * 7 + b'\1'
+
+
+def remember_entry(dedup_dir: str, date_str: str, entry: str) -> bool:
+    """
+    Record an entry in the per-day hash index.
+    Returns False if the same entry was already logged that day.
+
+    The index is a direct-mapped table of 8-byte hashes, so a check reads and
+    writes one slot no matter how many entries the day has seen. Updates are
+    serialized with an flock on the index itself.
+    """
+    import fcntl
+
+    os.makedirs(dedup_dir, exist_ok=True)
+    index_name = f"{date_str}.idx"
+    digest = entry_hash(entry)
+    offset = int.from_bytes(digest, 'little') % DEDUP_SLOTS * 8
+
+    fd = os.open(os.path.join(dedup_dir, index_name), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+        if os.fstat(fd).st_size == 0:
+            # First entry of a new day - drop the indexes of previous days
+            os.ftruncate(fd, DEDUP_SLOTS * 8)
+            for name in os.listdir(dedup_dir):
+                if name != index_name:
+                    try:
+                        os.remove(os.path.join(dedup_dir, name))
+                    except OSError:
+                        pass
+
+        if os.pread(fd, 8, offset) == digest:
+            return False
+        os.pwrite(fd, digest, offset)
+    finally:
+        os.close(fd)
+
+    return True
+
+
 def append_changelog_entry(changelog_path: str, entry: str) -> None:
-    """Insert a new entry at the top of the changelog file (descending order)."""
+    """Insert a new entry at the top of the changelog file (markdown storage mode)."""
+    import datetime
+
     try:
         header, entries = read_existing_changelog(changelog_path)
         today = datetime.datetime.now().strftime("%Y-%m-%d")
 
-        # Check if entry already exists (avoid duplicates)
-        if entry.strip() in entries:
-            return
-
         lines = entries.split('\n') if entries else []
-        today_line = get_today_section_line(entries)
-
-        if today_line is not None:
-            # Today's section exists, insert entry right after the date header
-            # Skip blank lines after the header
-            insert_idx = today_line + 1
-            while insert_idx < len(lines) and lines[insert_idx].strip() == "":
-                insert_idx += 1
-            lines.insert(insert_idx, f"- {entry}")
-        else:
-            # Create new section for today at the top
-            # Find where to insert (skip initial blank lines)
-            insert_idx = 0
-            while insert_idx < len(lines) and lines[insert_idx].strip() == "":
-                insert_idx += 1
+        insert_entry_line(lines, today, entry)
+        write_changelog(changelog_path, header, lines)
 
-            # Insert new date section at the top
-            new_section = ["\n", f"### {today}", "", f"- {entry}"]
-            for item in reversed(new_section):
-                lines.insert(insert_idx, item)
+    except Exception as e:
+        print(f"Error appending to changelog: {e}", file=sys.stderr)
+
+
+def render_changelog(changelog_path: str, journal_path: str) -> None:
+    """Fold pending journal records into the newest-first markdown changelog."""
+    from journal import drain_journal
+
+    try:
+        with drain_journal(journal_path) as records:
+            if not records:
+                return
 
-        # Write back to file
-        new_content = header + '\n'.join(lines)
+            header, entries = read_existing_changelog(changelog_path)
+            lines = entries.split('\n') if entries else []
 
-        # Ensure parent directory exists
-        os.makedirs(os.path.dirname(changelog_path), exist_ok=True)
+            # Records are chronological, so inserting each at the top of its
+            # date section keeps the markdown in descending order
+            for record in records:
+                insert_entry_line(lines, record['date'], format_changelog_entry(record))
 
-        with open(changelog_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+            write_changelog(changelog_path, header, lines)
 
     except Exception as e:
-        print(f"Error appending to changelog: {e}", file=sys.stderr)
+        print(f"Error rendering changelog: {e}", file=sys.stderr)
 
 
 def should_track_file(file_path: str) -> bool:
@@ -271,38 +374,47 @@ def should_track_file(file_path: str) -> bool:
 
     return True
 
-def main():
-    """Main hook execution function."""
-    try:
-        # Read input from stdin
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
-        sys.exit(1)
+def get_log_paths(cwd: str) -> tuple[str, str]:
+    """Return the (CHANGELOG.md, journal) paths for a project."""
+    logs_dir = os.path.join(cwd, ".claude", "logs")
+    return os.path.join(logs_dir, "CHANGELOG.md"), os.path.join(logs_dir, "changelog.jsonl")
 
+def get_dedup_dir(cwd: str) -> str:
+    """Return the directory holding the per-day entry hash indexes."""
+    return os.path.join(cwd, ".claude", "logs", ".changelog-dedup")
+
+def handle(input_data: dict) -> dict | None:
+    """Process one hook event and return the JSON output to print, if any."""
     # Extract relevant data
     hook_event = input_data.get("hook_event_name", "")
     tool_name = input_data.get("tool_name", "")
     tool_input = input_data.get("tool_input", {})
     cwd = input_data.get("cwd", "")
     transcript_path = input_data.get("transcript_path", "")
+    changelog_path, journal_path = get_log_paths(cwd)
+
+    # Render the markdown view once the agent finishes a turn
+    if hook_event in ["Stop", "SubagentStop"]:
+        with start_metrics().phase("render"):
+            render_changelog(changelog_path, journal_path)
+        return None
 
     # Only process PostToolUse events for file operations
     if hook_event != "PostToolUse":
-        sys.exit(0)
+        return None
 
     # Only track file modification tools
     if tool_name not in ["Write", "Edit", "MultiEdit"]:
-        sys.exit(0)
+        return None
 
     # Get file path from tool input
     file_path = tool_input.get("file_path", "")
     if not file_path:
-        sys.exit(0)
+        return None
 
     # Skip files we don't want to track
     if not should_track_file(file_path):
-        sys.exit(0)
+        return None
 
     # Make file path relative to project root if possible
     if file_path.startswith(cwd):
@@ -310,24 +422,77 @@ def main():
     else:
         relative_path = file_path
 
+    start_metrics()
+
     # Extract agent information
-    agent_name = extract_agent_name(transcript_path)
+    with metrics.phase("transcript"):
+        agent_name = extract_agent_name(transcript_path)
 
     # Determine change type and description
     change_type = determine_change_type(tool_name, file_path, tool_input)
     description = generate_description(tool_name, relative_path, change_type)
 
+    import datetime
+    from journal import append_record
+
     # Create timestamp
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    now = datetime.datetime.now()
+
+    record = {
+        "date": now.strftime("%Y-%m-%d"),
+        "time": now.strftime("%H:%M:%S"),
+        "type": change_type,
+        "description": description,
+        "file": relative_path,
+        "agent": agent_name
+    }
+
+    entry = format_changelog_entry(record)
+
+    with metrics.phase("log_write"):
+        # Check if entry already exists (avoid duplicates) without reading the changelog
+        try:
+            if not remember_entry(get_dedup_dir(cwd), record["date"], entry):
+                return None
+        except OSError as e:
+            print(f"Error updating changelog dedup index: {e}", file=sys.stderr)
+
+        if CHANGELOG_STORAGE == "markdown":
+            # Rewrite CHANGELOG.md immediately
+            append_changelog_entry(changelog_path, entry)
+        else:
+            # O(1) append; CHANGELOG.md is rendered on Stop/SubagentStop
+            try:
+                append_record(journal_path, record)
+            except OSError as e:
+                print(f"Error appending to changelog journal: {e}", file=sys.stderr)
 
-    # Format the entry
-    entry = f"{timestamp} | {change_type} | {description} | `{relative_path}` | {agent_name}"
+    # Success - no output needed
+    return None
 
-    # Append to changelog
-    changelog_path = os.path.join(cwd, ".claude", "logs", "CHANGELOG.md")
-    append_changelog_entry(changelog_path, entry)
 
-    # Success - no output needed
+def main():
+    """Main hook execution function."""
+    # Manual rendering: change-log.py --render
+    if sys.argv[1:2] == ["--render"]:
+        render_changelog(*get_log_paths(os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())))
+        sys.exit(0)
+
+    try:
+        # Read input from stdin
+        parse_start = time.perf_counter()
+        input_data = json.load(sys.stdin)
+        parse_time = time.perf_counter() - parse_start
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    output = handle(input_data)
+    if output is not None:
+        print(json.dumps(output))
+    if metrics is not None:
+        metrics.add("parse", parse_time)
+        metrics.flush(input_data.get("hook_event_name", ""))
     sys.exit(0)
 
 
@@ -7,15 +7,27 @@ It provides Claude with specific instructions for creating the summary.
 
 Event: PreCompact
 Trigger: manual or auto
+
+Phase timings are recorded (hook_metrics.py) after the instruction is printed.
 """
 
-import json
 import sys
+import time
 
 def main():
+    started = time.perf_counter()
+    raw_input = sys.stdin.buffer.read()
+
+    # Fast path: not a PreCompact event, exit before importing json
+    if b'"PreCompact"' not in raw_input:
+        sys.exit(0)
+
+    parse_start = time.perf_counter()
+    import json
     try:
-        # Read input from stdin
-        input_data = json.load(sys.stdin)
+        # Parse input from stdin
+        input_data = json.loads(raw_input)
+        parse_time = time.perf_counter() - parse_start
 
         # Extract relevant information
         hook_event = input_data.get("hook_event_name", "")
@@ -41,6 +53,12 @@ def main():
 
         # Print the instruction directly as it will be added to the compact process
         print(compact_instruction)
+        sys.stdout.flush()
+
+        from hook_metrics import HookMetrics
+        metrics = HookMetrics("compact-instructions", started)
+        metrics.add("parse", parse_time)
+        metrics.flush(hook_event)
 
         # Exit successfully
         sys.exit(0)
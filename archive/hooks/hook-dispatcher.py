@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Hook Dispatcher: one process per hook event
+
+Parses the hook event from stdin once and routes it to every registered
+handler module (changelog, task log, notifications, security) in the same
+interpreter, instead of Claude Code spawning one Python process per script.
+Handler modules are only imported when an event matches them, and a failing
+handler is reported on stderr without affecting the others.
+
+Each handler module exposes handle(input_data) returning the JSON output to
+print (or None). Handlers keep a module-level `metrics` that stays None until
+an event is relevant to them; the dispatcher flushes those that were created,
+plus its own timings, after the output has been written. hook_metrics is
+only imported when some handler acted on the event.
+"""
+
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+
+STARTED = time.perf_counter()
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (hook event, tool name matcher or None for any tool, handler script)
+# PreToolUse is not dispatched: settings run switch-plan-mode.py and
+# security-client.py (which talks to security-daemon.py) for it directly.
+HANDLERS = [
+    ("PostToolUse", None, "notify-ntfy.py"),
+    ("PostToolUse", r"Write|Edit|MultiEdit", "change-log.py"),
+    ("PostToolUse", r"TodoWrite", "task-log.py"),
+    ("Stop", None, "notify-ntfy.py"),
+    ("Stop", None, "task-log-stop.py"),
+    ("Stop", None, "change-log.py"),
+    ("Stop", None, "security.py"),
+    ("SubagentStop", None, "notify-ntfy.py"),
+    ("SubagentStop", None, "change-log.py"),
+    ("UserPromptSubmit", None, "notify-ntfy.py"),
+    ("SessionStart", None, "notify-ntfy.py"),
+    ("Stop", None, "hook_metrics.py"),
+]
+
+_modules = {}
+
+# Dispatcher phase timings in seconds, recorded once some handler's metrics exist
+_timings = {}
+
+
+def load_handler(script_name):
+    """Import a handler script once (file names contain hyphens)"""
+    if script_name not in _modules:
+        if HOOKS_DIR not in sys.path:
+            sys.path.insert(0, HOOKS_DIR)
+        module_name = "hook_" + script_name[:-3].replace("-", "_")
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(HOOKS_DIR, script_name))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[script_name] = module
+    return _modules[script_name]
+
+def matching_handlers(input_data):
+    """Handler scripts registered for this event and tool, in registration order"""
+    hook_event = input_data.get("hook_event_name", "")
+    tool_name = input_data.get("tool_name", "")
+
+    scripts = []
+    for event, matcher, script_name in HANDLERS:
+        if event != hook_event:
+            continue
+        if matcher is not None and not re.fullmatch(matcher, tool_name):
+            continue
+        scripts.append(script_name)
+    return scripts
+
+def merge_outputs(outputs):
+    """Combine handler outputs into the single JSON object Claude Code reads"""
+    merged = {}
+    for output in outputs:
+        for key, value in output.items():
+            if key == "suppressOutput":
+                merged[key] = merged.get(key, True) and value
+            else:
+                merged[key] = value
+    return merged
+
+def run_handlers(input_data):
+    """Call every matching handler, isolating failures; returns (outputs, modules)"""
+    outputs = []
+    modules = []
+    for script_name in matching_handlers(input_data):
+        start = time.perf_counter()
+        try:
+            module = load_handler(script_name)
+            modules.append(module)
+            output = module.handle(input_data)
+        except (Exception, SystemExit) as e:
+            print(f"Hook error in {script_name}: {e}", file=sys.stderr)
+            continue
+        finally:
+            _timings[script_name[:-3]] = time.perf_counter() - start
+        if output:
+            outputs.append(output)
+    return outputs, modules
+
+def main():
+    try:
+        parse_start = time.perf_counter()
+        input_data = json.load(sys.stdin)
+        _timings["parse"] = time.perf_counter() - parse_start
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    outputs, modules = run_handlers(input_data)
+
+    if outputs:
+        print(json.dumps(merge_outputs(outputs)))
+    sys.stdout.flush()
+
+    # Claude Code waits for the process to exit, so only the metrics
+    # appends (one O_APPEND write per handler) follow the output
+    hook_event = input_data.get("hook_event_name", "")
+    handler_metrics = [module.metrics for module in modules if getattr(module, "metrics", None) is not None]
+    if handler_metrics:
+        from hook_metrics import HookMetrics
+        metrics = HookMetrics("hook-dispatcher", STARTED)
+        for name, seconds in _timings.items():
+            metrics.add(name, seconds)
+        for module_metrics in handler_metrics:
+            module_metrics.flush(hook_event)
+        metrics.flush(hook_event)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Hook Metrics
+Phase timings for the hook scripts, exported as Prometheus histograms.
+
+Each hook keeps a HookMetrics instance and wraps its phases (stdin parse,
+transcript read, policy match, log write, notification send) in
+metrics.phase(). flush() appends one compact record per invocation to the
+bounded .claude/logs/hook-metrics.jsonl spool with a single O_APPEND write.
+
+On Stop the spool is drained into cumulative per-hook, per-phase histograms
+and written as Prometheus text to .claude/logs/hook-metrics.prom, ready for
+node_exporter's textfile collector. Set HOOK_METRICS=0 to disable recording.
+
+Usage:
+    python3 hook_metrics.py --prometheus   # fold the spool and write the .prom file
+    python3 hook_metrics.py --summary      # p50/p95/max per hook and phase from the spool
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("HOOK_METRICS", "1") != "0"
+
+# Metrics are best-effort; stop recording rather than grow without bound
+SPOOL_MAX_BYTES = 5 * 1024 * 1024
+
+# Histogram upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_NAME = "claude_hook_phase_duration_seconds"
+
+
+def get_metrics_paths():
+    """Return (spool, histogram state, prometheus file) paths"""
+    logs_dir = os.path.join(os.environ.get("CLAUDE_PROJECT_DIR", "."), ".claude", "logs")
+    return (
+        os.path.join(logs_dir, "hook-metrics.jsonl"),
+        os.path.join(logs_dir, "hook-metrics-state.json"),
+        os.path.join(logs_dir, "hook-metrics.prom")
+    )
+
+
+class HookMetrics:
+    """Phase timer for one hook; flush() writes what was timed since the last flush"""
+
+    def __init__(self, hook, started=None):
+        """started: perf_counter() at the start of the invocation, for instances created late"""
+        self.hook = hook
+        self.phases = {}
+        self.started = time.perf_counter() if started is None else started
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block and add it to the named phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """Add an externally measured duration to a phase"""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def flush(self, event=""):
+        """Append one record for this invocation to the spool and reset"""
+        total = time.perf_counter() - self.started
+        phases, self.phases = self.phases, {}
+        self.started = time.perf_counter()
+
+        if not ENABLED or not phases:
+            return
+
+        record = {
+            "t": int(time.time()),
+            "h": self.hook,
+            "e": event,
+            "ms": round(total * 1000, 3),
+            "p": {name: round(seconds * 1000, 3) for name, seconds in phases.items()}
+        }
+        try:
+            from journal import append_record
+            append_record(get_metrics_paths()[0], record, max_bytes=SPOOL_MAX_BYTES)
+        except OSError:
+            pass
+
+
+def observe(histograms, hook, phase, milliseconds):
+    """Add one observation to the cumulative histogram state"""
+    series = histograms.setdefault(hook, {}).setdefault(phase, {
+        "buckets": [0] * len(BUCKETS),
+        "sum": 0.0,
+        "count": 0
+    })
+    seconds = milliseconds / 1000
+    for i, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            series["buckets"][i] += 1
+    series["sum"] += seconds
+    series["count"] += 1
+
+def format_prometheus(histograms):
+    """Render histogram state in the Prometheus text exposition format"""
+    lines = [
+        f"# HELP {METRIC_NAME} Wall time spent in each hook phase.",
+        f"# TYPE {METRIC_NAME} histogram"
+    ]
+    for hook in sorted(histograms):
+        for phase in sorted(histograms[hook]):
+            series = histograms[hook][phase]
+            labels = f'hook="{hook}",phase="{phase}"'
+            for bound, count in zip(BUCKETS, series["buckets"]):
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound:g}"}} {count}')
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {series["count"]}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {series['sum']:.6f}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {series['count']}")
+    return "\n".join(lines) + "\n"
+
+def write_atomic(path, content):
+    """Replace a file so readers never see a partial write"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def export_prometheus():
+    """Fold the spool into the cumulative histograms and rewrite the .prom file"""
+    from journal import drain_journal
+
+    spool_path, state_path, prom_path = get_metrics_paths()
+    with drain_journal(spool_path) as records:
+        if not records and os.path.exists(prom_path):
+            return
+
+        try:
+            with open(state_path, "r") as f:
+                histograms = json.load(f)
+        except (OSError, ValueError):
+            histograms = {}
+
+        for record in records:
+            hook = record.get("h", "unknown")
+            observe(histograms, hook, "total", record.get("ms", 0))
+            for phase, milliseconds in record.get("p", {}).items():
+                observe(histograms, hook, phase, milliseconds)
+
+        write_atomic(state_path, json.dumps(histograms))
+        write_atomic(prom_path, format_prometheus(histograms))
+
+def print_summary():
+    """Print p50/p95/max per hook and phase for the records still in the spool"""
+    from journal import read_records
+
+    samples = {}
+    for record in read_records(get_metrics_paths()[0]):
+        hook = record.get("h", "unknown")
+        samples.setdefault((hook, "total"), []).append(record.get("ms", 0))
+        for phase, milliseconds in record.get("p", {}).items():
+            samples.setdefault((hook, phase), []).append(milliseconds)
+
+    print(f"{'hook':<20} {'phase':<14} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for (hook, phase), values in sorted(samples.items()):
+        values.sort()
+        p50 = values[(len(values) - 1) // 2]
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(f"{hook:<20} {phase:<14} {len(values):>6} {p50:>9.2f} {p95:>9.2f} {values[-1]:>9.2f}")
+
+
+def handle(input_data):
+    """Dispatcher entry point: export the histograms when the agent stops"""
+    if input_data.get("hook_event_name") == "Stop":
+        export_prometheus()
+    return None
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--summary"]:
+        print_summary()
+    else:
+        export_prometheus()
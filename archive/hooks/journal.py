@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Journal
+Append-only JSONL journals shared by the logging hooks.
+
+Hooks append one record per event with a single O_APPEND write, so the cost
+of logging no longer depends on how large the log already is. Renderers
+drain the pending records later and fold them into the markdown views.
+
+Writers hold a shared flock on <journal>.writers from opening the journal
+until their write lands; a drain takes it exclusively only for the rename,
+so no writer can still be appending to a journal that has been claimed.
+A claimed batch that keeps failing to render is set aside after
+MAX_DRAIN_FAILURES attempts so it cannot hold up the live journal forever.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Failed renders of one claimed batch before it is quarantined
+MAX_DRAIN_FAILURES = 3
+
+
+def append_record(journal_path: str, record: dict, max_bytes: int | None = None) -> bool:
+    """
+    Append one JSON record as a single line (atomic for concurrent writers).
+    Returns False without writing if the journal already holds max_bytes.
+    """
+    os.makedirs(os.path.dirname(journal_path) or '.', exist_ok=True)
+    line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+
+    lock_fd = os.open(journal_path + '.writers', os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_SH)
+        fd = os.open(journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if max_bytes is not None and os.fstat(fd).st_size >= max_bytes:
+                return False
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    finally:
+        os.close(lock_fd)
+
+    return True
+
+
+def record_drop(journal_path: str) -> int:
+    """
+    Count one record dropped because the journal was full.
+    The counter is one byte per drop, so concurrent writers never lose counts.
+    Returns the number of drops since the counter was last taken.
+    """
+    fd = os.open(journal_path + '.dropped', os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, b'.')
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+
+
+def claim_drop_count(journal_path: str) -> int:
+    """
+    Return the number of dropped records not yet reported.
+    The counter is moved aside rather than reset, so drops claimed by a render
+    that failed are claimed again by the next one; call clear_drop_count once
+    they have been reported. Callers serialize through drain_journal.
+    """
+    counter_path = journal_path + '.dropped'
+    taken_path = counter_path + '.taken'
+    claiming_path = counter_path + '.claiming'
+    try:
+        os.replace(counter_path, claiming_path)
+    except FileNotFoundError:
+        pass
+    else:
+        # Fold the new drops into any still unreported from an earlier claim
+        with open(taken_path, 'ab') as f:
+            f.write(b'.' * os.path.getsize(claiming_path))
+        os.remove(claiming_path)
+
+    try:
+        return os.path.getsize(taken_path)
+    except FileNotFoundError:
+        return 0
+
+
+def clear_drop_count(journal_path: str) -> None:
+    """Forget the drops returned by claim_drop_count after they were reported."""
+    try:
+        os.remove(journal_path + '.dropped.taken')
+    except FileNotFoundError:
+        pass
+
+
+def read_records(journal_path: str) -> list[dict]:
+    """Read all complete records from a journal, skipping corrupt lines."""
+    records = []
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+
+    return records
+
+
+@contextmanager
+def drain_journal(journal_path: str) -> Iterator[list[dict]]:
+    """
+    Yield the pending records of a journal for rendering.
+
+    The journal is moved aside first so hooks keep appending to a fresh file.
+    The claimed records are only discarded when the with-block succeeds; a
+    failed render leaves them to be picked up by the next one. While a batch
+    is pending no new one is claimed, so after MAX_DRAIN_FAILURES failures
+    the batch is renamed to <journal>.failed-<unix time> and the next drain
+    moves on to the live journal.
+    """
+    draining_path = journal_path + '.draining'
+    failures_path = draining_path + '.failures'
+    os.makedirs(os.path.dirname(journal_path) or '.', exist_ok=True)
+
+    with open(journal_path + '.lock', 'w') as lock:
+        # Serialize renderers; writers never take this lock
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        if not os.path.exists(draining_path) and os.path.exists(journal_path):
+            with open(journal_path + '.writers', 'w') as writers:
+                # Wait out writes in flight; later writers open the fresh journal
+                fcntl.flock(writers, fcntl.LOCK_EX)
+                os.replace(journal_path, draining_path)
+
+        try:
+            yield read_records(draining_path)
+        except BaseException:
+            try:
+                quarantine_if_failing(draining_path, failures_path, journal_path)
+            except OSError:
+                pass
+            raise
+
+        for path in (draining_path, failures_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def quarantine_if_failing(draining_path: str, failures_path: str, journal_path: str) -> None:
+    """Count one failed render; set the batch aside once it has failed too often."""
+    if not os.path.exists(draining_path):
+        return
+    with open(failures_path, 'ab') as f:
+        f.write(b'.')
+        failures = f.tell()
+    if failures < MAX_DRAIN_FAILURES:
+        return
+
+    os.replace(draining_path, f'{journal_path}.failed-{int(time.time())}')
+    os.remove(failures_path)
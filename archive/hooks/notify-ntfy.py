@@ -2,47 +2,99 @@
 """
 ntfy.sh Notification Hook for Claude Code
 Sends push notifications to your phone/browser via ntfy.sh
+
+Notifications are appended to .claude/hooks/ntfy-queue.jsonl and delivered
+in the background by ntfy-sender.py, so the hook never waits on the network.
 """
 
 import json
 import sys
 import os
-import subprocess
+import time
 from datetime import datetime
 
-# Configuration - Change this to your unique topic name
-NTFY_TOPIC = "claude-code-tasks"  # Change this to something unique!
-NTFY_SERVER = "https://ntfy.sh"  # Default public server (or use your own)
+from activity_store import get_store
+from journal import append_record
 
-def send_ntfy_notification(title, message, priority="default"):
-    """Send notification via ntfy.sh using curl"""
-    try:
-        url = f"{NTFY_SERVER}/{NTFY_TOPIC}"
+# Configuration - Change this to your unique topic name (or set NTFY_TOPIC)
+NTFY_TOPIC = os.environ.get('NTFY_TOPIC', "claude-code-tasks")  # Change this to something unique!
+NTFY_SERVER = os.environ.get('NTFY_SERVER', "https://ntfy.sh")  # Default public server (or use your own)
 
-        # Build curl command
-        curl_cmd = [
-            'curl', '-s',
-            '-H', f'Title: {title}',
-            '-H', f'Priority: {priority}',
-            '-d', message,
-            url
-        ]
+# Notifications are queued here and delivered by ntfy-sender.py
+QUEUE_MAX_BYTES = 1024 * 1024
 
-        # Send the notification
-        result = subprocess.run(curl_cmd, capture_output=True, text=True)
+# Created by start_metrics() once an event turns out to be relevant, so
+# irrelevant events never import hook_metrics
+metrics = None
+STARTED = time.perf_counter()
 
-        # Check if successful (ntfy returns JSON with id field on success)
-        if '"id"' in result.stdout:
-            # Log success
-            log_file = os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude/hooks/ntfy.log')
-            try:
-                with open(log_file, 'a') as f:
-                    f.write(f"[{datetime.now().isoformat()}] Sent: {title} - {message}\n")
-            except:
-                pass
-            return True
+def start_metrics():
+    """Return this hook's HookMetrics, importing hook_metrics on first use"""
+    global metrics
+    if metrics is None:
+        from hook_metrics import HookMetrics
+        metrics = HookMetrics("notify-ntfy", STARTED)
+    return metrics
 
-        return False
+def get_hooks_dir():
+    """Project .claude/hooks directory (must match ntfy-sender.py)"""
+    return os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude', 'hooks')
+
+def ensure_sender_running():
+    """Start ntfy-sender.py unless a sender already holds its lock"""
+    import fcntl
+    try:
+        with open(os.path.join(get_hooks_dir(), 'ntfy-sender.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return
+
+    import subprocess  # Only needed when no sender is running
+    sender = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ntfy-sender.py')
+    subprocess.Popen(
+        [sys.executable, sender],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+def activity_summary(session):
+    """The session fields ntfy-sender.py uses to summarize a coalesced digest"""
+    return {
+        'files_edited': session.get('files_edited', []),
+        'files_edited_count': session.get('files_edited_count', len(session.get('files_edited', []))),
+        'files_created': session.get('files_created', []),
+        'files_created_count': session.get('files_created_count', len(session.get('files_created', []))),
+        'commands_run': session.get('commands_run', 0)
+    }
+
+def send_ntfy_notification(title, message, priority="default", event="", session_id="", label="", activity=None):
+    """
+    Queue a notification for ntfy-sender.py and return without waiting for HTTP.
+    event and session_id select the sender's coalescing window and rate limit;
+    label and activity are used if the notification is merged into a digest.
+    """
+    try:
+        with start_metrics().phase("notify"):
+            record = {
+                'title': title,
+                'message': message,
+                'priority': priority,
+                'server': NTFY_SERVER,
+                'topic': NTFY_TOPIC,
+                'event': event,
+                'session': session_id,
+                'label': label or title,
+                'activity': activity or {}
+            }
+            queue_path = os.path.join(get_hooks_dir(), 'ntfy-queue.jsonl')
+            if not append_record(queue_path, record, max_bytes=QUEUE_MAX_BYTES):
+                print("ntfy queue full, notification dropped", file=sys.stderr)
+                return False
+
+            ensure_sender_running()
+        return True
     except Exception as e:
         # Log error but don't block Claude
         print(f"ntfy error: {e}", file=sys.stderr)
@@ -55,41 +107,21 @@ def track_session_activity(input_data):
 
     # If no session_id, we can't track this activity properly
     if not session_id:
-        return
+        return None
 
     hook_event = input_data.get('hook_event_name', '')
     tool_name = input_data.get('tool_name', '')
     params = input_data.get('tool_input', {})
 
-    tracking_file = os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude/hooks/session_activity.json')
-
-    # Load existing data
-    session_data = {}
-    if os.path.exists(tracking_file):
-        try:
-            with open(tracking_file, 'r') as f:
-                session_data = json.load(f)
-        except:
-            pass
-
-    # Initialize session if not exists
-    if session_id not in session_data:
-        session_data[session_id] = {
-            'files_edited': [],
-            'files_created': [],
-            'commands_run': 0,
-            'agents_launched': [],
-            'last_prompt': '',
-            'all_prompts': [],
-            'last_activity': datetime.now().isoformat()
-        }
-
-    # Ensure all_prompts exists for older sessions
-    if 'all_prompts' not in session_data[session_id]:
-        session_data[session_id]['all_prompts'] = []
-
-    current = session_data[session_id]
+    kind, value = activity_change(hook_event, tool_name, params, input_data)
+    try:
+        return get_store().record(session_id, kind, value)
+    except Exception:
+        # Activity tracking must never block the notification
+        return None
 
+def activity_change(hook_event, tool_name, params, input_data):
+    """The (kind, value) change an event makes to the session, or (None, None)"""
     # Track user prompts
     if hook_event == "UserPromptSubmit":
         # According to Claude Code docs, UserPromptSubmit has prompt directly in input_data
@@ -99,45 +131,28 @@ def track_session_activity(input_data):
             # Truncate very long prompts
             if len(prompt) > 150:
                 prompt = prompt[:150] + '...'
-            current['last_prompt'] = prompt
-            # Keep track of all prompts in session
-            current['all_prompts'].append(prompt)
-            # Only keep last 5 prompts
-            if len(current['all_prompts']) > 5:
-                current['all_prompts'] = current['all_prompts'][-5:]
+            return 'prompt', prompt
 
     # Track different tool types
     elif tool_name in ["Edit", "MultiEdit"]:
         file_path = params.get('file_path', '')
         if file_path:
-            basename = os.path.basename(file_path)
-            if basename not in current['files_edited']:
-                current['files_edited'].append(basename)
+            return 'file_edited', os.path.basename(file_path)
 
     elif tool_name == "Write":
         file_path = params.get('file_path', '')
         if file_path:
-            basename = os.path.basename(file_path)
-            if basename not in current['files_created']:
-                current['files_created'].append(basename)
+            return 'file_created', os.path.basename(file_path)
 
     elif tool_name == "Bash":
-        current['commands_run'] += 1
+        return 'command', None
 
     elif tool_name == "Task":
         subagent = params.get('subagent_type', '')
-        if subagent and subagent not in current['agents_launched']:
-            current['agents_launched'].append(subagent)
+        if subagent:
+            return 'agent', subagent
 
-    current['last_activity'] = datetime.now().isoformat()
-
-    # Save updated data
-    try:
-        os.makedirs(os.path.dirname(tracking_file), exist_ok=True)
-        with open(tracking_file, 'w') as f:
-            json.dump(session_data, f, indent=2)
-    except:
-        pass
+    return None, None
 
 def get_context_message(input_data):
     """Extract contextual information from the input data"""
@@ -174,61 +189,60 @@ def get_context_message(input_data):
         transcript_path = input_data.get('transcript_path', '')
 
         # Try to read recent activity from a tracking file if we maintain one
-        tracking_file = os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude/hooks/session_activity.json')
-        if os.path.exists(tracking_file) and session_id:
+        if session_id:
             try:
-                with open(tracking_file, 'r') as f:
-                    session_data = json.load(f)
-                    current_session = session_data.get(session_id, {})
+                current_session = get_store().load(session_id)
 
-                    # If we have the session, use it
-                    if current_session:
-                        pass  # We have the data
+                # If we have the session, use it
+                if current_session:
+                    pass  # We have the data
+                else:
+                    # Session not found - this might be the first Stop without any tracked activity
+                    current_session = {}
+
+                files_edited = current_session.get('files_edited', [])
+                files_created = current_session.get('files_created', [])
+                commands_run = current_session.get('commands_run', 0)
+                agents_launched = current_session.get('agents_launched', [])
+                last_prompt = current_session.get('last_prompt', '')
+                all_prompts = current_session.get('all_prompts', [])
+
+                # Use all prompts if available, otherwise use last prompt
+                if all_prompts:
+                    user_prompts = all_prompts
+                elif last_prompt:
+                    user_prompts = [last_prompt]
+
+                # Build a more descriptive summary
+                if files_edited:
+                    # The lists only hold the most recent names; counts are exact
+                    count = current_session.get('files_edited_count', len(files_edited))
+                    if count <= 3:
+                        # Show actual filenames if not too many
+                        files_str = ', '.join(files_edited[:3])
+                        context_parts.append(f"📝 Edited: {files_str}")
                     else:
-                        # Session not found - this might be the first Stop without any tracked activity
-                        current_session = {}
-
-                    files_edited = current_session.get('files_edited', [])
-                    files_created = current_session.get('files_created', [])
-                    commands_run = current_session.get('commands_run', 0)
-                    agents_launched = current_session.get('agents_launched', [])
-                    last_prompt = current_session.get('last_prompt', '')
-                    all_prompts = current_session.get('all_prompts', [])
+                        context_parts.append(f"📝 Edited {count} files")
 
-                    # Use all prompts if available, otherwise use last prompt
-                    if all_prompts:
-                        user_prompts = all_prompts
-                    elif last_prompt:
-                        user_prompts = [last_prompt]
-
-                    # Build a more descriptive summary
-                    if files_edited:
-                        count = len(files_edited)
-                        if count <= 3:
-                            # Show actual filenames if not too many
-                            files_str = ', '.join(files_edited[:3])
-                            context_parts.append(f"📝 Edited: {files_str}")
-                        else:
-                            context_parts.append(f"📝 Edited {count} files")
-
-                    if files_created:
-                        count = len(files_created)
-                        if count <= 2:
-                            files_str = ', '.join(files_created[:2])
-                            context_parts.append(f"✨ Created: {files_str}")
-                        else:
-                            context_parts.append(f"✨ Created {count} files")
+                if files_created:
+                    count = current_session.get('files_created_count', len(files_created))
+                    if count <= 2:
+                        files_str = ', '.join(files_created[:2])
+                        context_parts.append(f"✨ Created: {files_str}")
+                    else:
+                        context_parts.append(f"✨ Created {count} files")
 
-                    if commands_run:
-                        context_parts.append(f"⚡ {commands_run} command{'s' if commands_run > 1 else ''}")
+                if commands_run:
+                    context_parts.append(f"⚡ {commands_run} command{'s' if commands_run > 1 else ''}")
 
-                    if agents_launched:
-                        if len(agents_launched) <= 3:
-                            # Show agent names if not too many
-                            agents_str = ', '.join(agents_launched)
-                            context_parts.append(f"🤖 Used: {agents_str}")
-                        else:
-                            context_parts.append(f"🤖 {len(agents_launched)} agents")
+                if agents_launched:
+                    count = current_session.get('agents_launched_count', len(agents_launched))
+                    if count <= 3:
+                        # Show agent names if not too many
+                        agents_str = ', '.join(agents_launched)
+                        context_parts.append(f"🤖 Used: {agents_str}")
+                    else:
+                        context_parts.append(f"🤖 {count} agents")
             except:
                 pass
 
@@ -346,208 +360,214 @@ def get_context_message(input_data):
         'prompt': prompt_display if 'prompt_display' in locals() else ""
     }
 
-def main():
-    try:
-        # Read input from Claude
-        input_data = json.load(sys.stdin)
-
-        # Extract relevant information
-        hook_event = input_data.get('hook_event_name', '')
+def handle(input_data):
+    """Process one hook event (notifications are sent, nothing is printed)"""
+    # Extract relevant information
+    hook_event = input_data.get('hook_event_name', '')
 
-        # Handle different hook events
-        if hook_event == "Stop":
-            # Main completion hook
+    # Handle different hook events
+    if hook_event == "Stop":
+        # Main completion hook
+        with start_metrics().phase("context"):
             context_info = get_context_message(input_data)
 
-            # Build detailed message
-            title = "🤖 Main Agent"
-
-            # Start with the user's prompt(s) if available
-            message_parts = []
-            if context_info.get('prompt'):
-                message_parts.append(f"💬 Prompt:\n{context_info['prompt']}")
-                message_parts.append("")  # Empty line for spacing
-
-            # Add the work summary
-            if context_info['context']:
-                message_parts.append("📊 Work Done:")
-                context_lines = context_info['context'].split(' | ')
-                if len(context_lines) > 1:
-                    # Multi-line format for better readability
-                    for line in context_lines:
-                        message_parts.append(line)
-                else:
-                    message_parts.append(context_info['context'])
+        # Build detailed message
+        title = "🤖 Main Agent"
+
+        # Start with the user's prompt(s) if available
+        message_parts = []
+        if context_info.get('prompt'):
+            message_parts.append(f"💬 Prompt:\n{context_info['prompt']}")
+            message_parts.append("")  # Empty line for spacing
+
+        # Add the work summary
+        if context_info['context']:
+            message_parts.append("📊 Work Done:")
+            context_lines = context_info['context'].split(' | ')
+            if len(context_lines) > 1:
+                # Multi-line format for better readability
+                for line in context_lines:
+                    message_parts.append(line)
+            else:
+                message_parts.append(context_info['context'])
 
-            # Add timestamp
-            message_parts.append(f"\n⏰ {context_info['timestamp']}")
+        # Nobody was asked to approve anything this session; proc_tree is
+        # only needed here, so PostToolUse events never import it
+        import proc_tree
+        if proc_tree.skip_permissions():
+            message_parts.append("🔓 Ran with --dangerously-skip-permissions")
 
-            message = '\n'.join(message_parts)
+        # Add timestamp
+        message_parts.append(f"\n⏰ {context_info['timestamp']}")
 
-            # Determine priority based on context
-            priority = "default"
-            if "error" in context_info['context'].lower() or "failed" in context_info['context'].lower():
-                priority = "high"
-                title = "⚠️ Main Agent"
+        message = '\n'.join(message_parts)
 
-            # Send the notification
-            send_ntfy_notification(
-                title,
-                message,
-                priority=priority
-            )
+        # Determine priority based on context
+        priority = "default"
+        if "error" in context_info['context'].lower() or "failed" in context_info['context'].lower():
+            priority = "high"
+            title = "⚠️ Main Agent"
 
-        elif hook_event == "SubagentStop":
-            # Subagent completion hook - similar to Stop but for subagents
-            # Get session information
-            session_id = input_data.get('session_id', '')
-
-            # Try to get the subagent type from the input
-            subagent_type = 'Subagent'
-
-            # Check in params first
-            params = input_data.get('params', {})
-            if params.get('subagent_type'):
-                subagent_type = params.get('subagent_type', 'Subagent')
-
-            # Format the subagent name for the title (capitalize and format nicely)
-            formatted_agent = subagent_type.replace('-', ' ').title()
-
-            # Build context info similar to Stop event
-            context_parts = []
-            user_prompts = []
-
-            # Try to read activity from tracking file
-            tracking_file = os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude/hooks/session_activity.json')
-            if os.path.exists(tracking_file) and session_id:
-                try:
-                    with open(tracking_file, 'r') as f:
-                        session_data = json.load(f)
-                        current_session = session_data.get(session_id, {})
-
-                        if current_session:
-                            files_edited = current_session.get('files_edited', [])
-                            files_created = current_session.get('files_created', [])
-                            commands_run = current_session.get('commands_run', 0)
-                            all_prompts = current_session.get('all_prompts', [])
-
-                            # Get prompts
-                            if all_prompts:
-                                user_prompts = all_prompts
-
-                            # Build work summary
-                            if files_edited:
-                                count = len(files_edited)
-                                if count <= 3:
-                                    files_str = ', '.join(files_edited[:3])
-                                    context_parts.append(f"📝 Edited: {files_str}")
-                                else:
-                                    context_parts.append(f"📝 Edited {count} files")
-
-                            if files_created:
-                                count = len(files_created)
-                                if count <= 2:
-                                    files_str = ', '.join(files_created[:2])
-                                    context_parts.append(f"✨ Created: {files_str}")
-                                else:
-                                    context_parts.append(f"✨ Created {count} files")
-
-                            if commands_run:
-                                context_parts.append(f"⚡ {commands_run} command{'s' if commands_run > 1 else ''}")
-                except:
-                    pass
-
-            # Format prompt for display (only most recent)
-            prompt_display = ""
-            if user_prompts:
-                last_prompt = user_prompts[-1]
-                prompt_text = last_prompt.strip()
-                if len(prompt_text) > 150:
-                    prompt_text = prompt_text[:150] + '...'
-                prompt_display = prompt_text
-
-            # Build message
-            title = f"🤖 {formatted_agent}"
-            message_parts = []
-
-            # Add prompt if available
-            if prompt_display:
-                message_parts.append(f"💬 Prompt:\n{prompt_display}")
-                message_parts.append("")  # Empty line for spacing
-
-            # Add work summary
-            if context_parts:
-                message_parts.append("📊 Work Done:")
-                for part in context_parts:
-                    message_parts.append(part)
-            else:
-                message_parts.append("✅ Task completed")
+        # Send the notification
+        send_ntfy_notification(
+            title,
+            message,
+            priority=priority,
+            event=hook_event,
+            session_id=input_data.get('session_id', '')
+        )
+
+    elif hook_event == "SubagentStop":
+        # Subagent completion hook - similar to Stop but for subagents
+        # Get session information
+        session_id = input_data.get('session_id', '')
 
-            # Add timestamp
-            from datetime import timedelta
-            edt_time = datetime.now() + timedelta(hours=3)
-            message_parts.append(f"\n⏰ {edt_time.strftime('%I:%M %p EDT')}")
+        # Try to get the subagent type from the input
+        subagent_type = 'Subagent'
 
-            message = '\n'.join(message_parts)
+        # Check in params first
+        params = input_data.get('params', {})
+        if params.get('subagent_type'):
+            subagent_type = params.get('subagent_type', 'Subagent')
 
-            send_ntfy_notification(
-                title,
-                message,
-                priority="low"  # Subagent completions are usually less critical
-            )
+        # Format the subagent name for the title (capitalize and format nicely)
+        formatted_agent = subagent_type.replace('-', ' ').title()
 
-        elif hook_event == "PostToolUse":
-            # Track all tool usage for session summary
-            track_session_activity(input_data)
+        # Build context info similar to Stop event
+        context_parts = []
+        user_prompts = []
+        activity = {}
+
+        # Try to read activity from tracking file
+        if session_id:
+            try:
+                current_session = get_store().load(session_id)
+
+                if current_session:
+                    activity = activity_summary(current_session)
+                    files_edited = current_session.get('files_edited', [])
+                    files_created = current_session.get('files_created', [])
+                    commands_run = current_session.get('commands_run', 0)
+                    all_prompts = current_session.get('all_prompts', [])
+
+                    # Get prompts
+                    if all_prompts:
+                        user_prompts = all_prompts
 
-            # Optional: Add notifications for specific tool completions
-            tool_name = input_data.get('tool_name', '')
+                    # Build work summary
+                    if files_edited:
+                        count = current_session.get('files_edited_count', len(files_edited))
+                        if count <= 3:
+                            files_str = ', '.join(files_edited[:3])
+                            context_parts.append(f"📝 Edited: {files_str}")
+                        else:
+                            context_parts.append(f"📝 Edited {count} files")
 
-            # Only notify for significant tools
-            if tool_name in ["Task", "SlashCommand"]:
+                    if files_created:
+                        count = current_session.get('files_created_count', len(files_created))
+                        if count <= 2:
+                            files_str = ', '.join(files_created[:2])
+                            context_parts.append(f"✨ Created: {files_str}")
+                        else:
+                            context_parts.append(f"✨ Created {count} files")
+
+                    if commands_run:
+                        context_parts.append(f"⚡ {commands_run} command{'s' if commands_run > 1 else ''}")
+            except:
+                pass
+
+        # Format prompt for display (only most recent)
+        prompt_display = ""
+        if user_prompts:
+            last_prompt = user_prompts[-1]
+            prompt_text = last_prompt.strip()
+            if len(prompt_text) > 150:
+                prompt_text = prompt_text[:150] + '...'
+            prompt_display = prompt_text
+
+        # Build message
+        title = f"🤖 {formatted_agent}"
+        message_parts = []
+
+        # Add prompt if available
+        if prompt_display:
+            message_parts.append(f"💬 Prompt:\n{prompt_display}")
+            message_parts.append("")  # Empty line for spacing
+
+        # Add work summary
+        if context_parts:
+            message_parts.append("📊 Work Done:")
+            for part in context_parts:
+                message_parts.append(part)
+        else:
+            message_parts.append("✅ Task completed")
+
+        # Add timestamp
+        from datetime import timedelta
+        edt_time = datetime.now() + timedelta(hours=3)
+        message_parts.append(f"\n⏰ {edt_time.strftime('%I:%M %p EDT')}")
+
+        message = '\n'.join(message_parts)
+
+        send_ntfy_notification(
+            title,
+            message,
+            priority="low",  # Subagent completions are usually less critical
+            event=hook_event,
+            session_id=session_id,
+            label=formatted_agent,
+            activity=activity
+        )
+
+    elif hook_event == "PostToolUse":
+        # Track all tool usage for session summary
+        with start_metrics().phase("log_write"):
+            current = track_session_activity(input_data)
+
+        # Optional: Add notifications for specific tool completions
+        tool_name = input_data.get('tool_name', '')
+
+        # Only notify for significant tools
+        if tool_name in ["Task", "SlashCommand"]:
+            with metrics.phase("context"):
                 context_info = get_context_message(input_data)
 
-                title = f"🔧 Tool - {context_info['project']}"
-                message = f"{context_info['context']}\n⏰ {context_info['timestamp']}"
+            title = f"🔧 Tool - {context_info['project']}"
+            message = f"{context_info['context']}\n⏰ {context_info['timestamp']}"
 
-                send_ntfy_notification(
-                    title,
-                    message,
-                    priority="low"
-                )
+            send_ntfy_notification(
+                title,
+                message,
+                priority="low",
+                event=hook_event,
+                session_id=input_data.get('session_id', ''),
+                label=context_info['context'],
+                activity=activity_summary(current) if current else None
+            )
 
-        elif hook_event == "UserPromptSubmit":
-            # Track the prompt for session context
+    elif hook_event == "UserPromptSubmit":
+        # Track the prompt for session context
+        with start_metrics().phase("log_write"):
             track_session_activity(input_data)
-            # Don't send notifications for prompts, just track them
-
-        elif hook_event == "SessionStart":
-            # Clean up old session data (older than 7 days)
-            tracking_file = os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', '.'), '.claude/hooks/session_activity.json')
-            if os.path.exists(tracking_file):
-                try:
-                    with open(tracking_file, 'r') as f:
-                        session_data = json.load(f)
-
-                    # Remove old sessions
-                    now = datetime.now()
-                    cleaned_data = {}
-                    for sid, data in session_data.items():
-                        last_activity = data.get('last_activity', '')
-                        if last_activity:
-                            try:
-                                last_time = datetime.fromisoformat(last_activity.replace('Z', '+00:00'))
-                                age_days = (now - last_time).days
-                                if age_days < 7:
-                                    cleaned_data[sid] = data
-                            except:
-                                cleaned_data[sid] = data  # Keep if can't parse date
-
-                    # Save cleaned data
-                    with open(tracking_file, 'w') as f:
-                        json.dump(cleaned_data, f, indent=2)
-                except:
-                    pass
+        # Don't send notifications for prompts, just track them
+
+    elif hook_event == "SessionStart":
+        # Drop sessions idle for 7 days
+        try:
+            get_store().cleanup()
+        except Exception:
+            pass
+
+def main():
+    try:
+        # Read input from Claude
+        parse_start = time.perf_counter()
+        input_data = json.load(sys.stdin)
+        parse_time = time.perf_counter() - parse_start
+        handle(input_data)
+        if metrics is not None:
+            metrics.add('parse', parse_time)
+            metrics.flush(input_data.get('hook_event_name', ''))
 
         # Success - continue normally
         sys.exit(0)
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+ntfy Sender: background delivery for notify-ntfy.py
+
+notify-ntfy.py only appends notifications to the .claude/hooks/ntfy-queue.jsonl
+spool and returns. This process drains the spool and delivers the queued
+messages back-to-back through ntfy_client.NtfyClient (one keep-alive
+connection per server), retrying failed requests with bounded exponential
+backoff. It lingers for IDLE_EXIT_SECONDS after the queue empties so the
+next burst reuses the warm connection, then exits; notify-ntfy.py starts it
+again when needed.
+
+Bursts are coalesced per session: a notification whose event has a
+coalescing window is held for that long, and everything the session queued
+for the same event meanwhile goes out as one digest. Each session also has
+a token bucket; a digest that finds it empty stays pending and absorbs
+later notifications until a token is available.
+
+Delivery is at-least-once. Records leave the spool only after they have been
+written to ntfy-queue.jsonl.held, which is rewritten as digests go out and
+reloaded by the next sender, so a sender that is killed or crashes resends
+what it was holding rather than losing it. A message that still fails after
+MAX_ATTEMPTS is logged to ntfy.log and dropped.
+
+Only one sender runs per project: it holds an exclusive flock on
+.claude/hooks/ntfy-sender.lock for its whole lifetime.
+
+Configuration (environment):
+    NTFY_SERVER          base URL, e.g. http://127.0.0.1:8080 for a local stand-in
+    NTFY_TOPIC           topic name
+    NTFY_SENDER_LINGER   seconds to stay alive with an empty queue (default 300)
+    NTFY_COALESCE        per-event windows in seconds, e.g. "SubagentStop=10,PostToolUse=15"
+    NTFY_RATE_PER_MINUTE pushes per session per minute (default 6)
+    NTFY_RATE_BURST      pushes a session may send back-to-back (default 3)
+
+Usage:
+    python3 ntfy-sender.py            # drain the queue in the foreground
+    python3 ntfy-sender.py --detach   # start in the background (no-op if running)
+"""
+
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from journal import drain_journal, read_records
+from ntfy_client import NtfyClient, NtfyError
+
+# Defaults for records that do not name a server or topic (must match notify-ntfy.py)
+NTFY_TOPIC = os.environ.get("NTFY_TOPIC", "claude-code-tasks")
+NTFY_SERVER = os.environ.get("NTFY_SERVER", "https://ntfy.sh")
+
+# Bounded retry: attempts per message and backoff between them
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# Queue polling while running, and how long an empty queue keeps us alive
+# (lingering keeps the connection warm for the next burst)
+POLL_INTERVAL = 0.2
+IDLE_EXIT_SECONDS = float(os.environ.get("NTFY_SENDER_LINGER", 300))
+
+# Seconds to hold a notification so a burst for the same session and event
+# goes out as one digest; events not listed are sent without waiting
+COALESCE_WINDOWS = {
+    "SubagentStop": 10.0,
+    "PostToolUse": 15.0
+}
+
+# Per-session token bucket
+RATE_PER_MINUTE = float(os.environ.get("NTFY_RATE_PER_MINUTE", 6))
+RATE_BURST = float(os.environ.get("NTFY_RATE_BURST", 3))
+
+# Digest titles per event, and how many labels a digest lists
+DIGEST_TITLES = {
+    "SubagentStop": "🤖 {count} subagents finished",
+    "PostToolUse": "🔧 {count} tools finished"
+}
+DIGEST_MAX_LABELS = 8
+
+PRIORITIES = ("min", "low", "default", "high", "urgent")
+
+
+def get_hooks_dir():
+    """Project .claude/hooks directory (must match notify-ntfy.py)"""
+    return os.path.join(os.environ.get("CLAUDE_PROJECT_DIR", "."), ".claude", "hooks")
+
+def get_queue_path():
+    return os.path.join(get_hooks_dir(), "ntfy-queue.jsonl")
+
+def get_lock_path():
+    return os.path.join(get_hooks_dir(), "ntfy-sender.lock")
+
+def get_held_path():
+    """Notifications taken off the spool but not delivered yet"""
+    return get_queue_path() + ".held"
+
+def load_coalesce_windows():
+    """COALESCE_WINDOWS with NTFY_COALESCE overrides applied"""
+    windows = dict(COALESCE_WINDOWS)
+    for item in os.environ.get("NTFY_COALESCE", "").split(","):
+        event, _, seconds = item.partition("=")
+        try:
+            windows[event.strip()] = float(seconds)
+        except ValueError:
+            continue
+    return windows
+
+def log_line(text):
+    """Append a line to ntfy.log, ignoring failures"""
+    try:
+        with open(os.path.join(get_hooks_dir(), "ntfy.log"), "a") as f:
+            f.write(f"[{datetime.now().isoformat()}] {text}\n")
+    except OSError:
+        pass
+
+
+def deliver(clients, record):
+    """Deliver one queued notification with bounded retry; returns True on success"""
+    title = record.get("title", "")
+    message = record.get("message", "")
+    server = record.get("server", NTFY_SERVER)
+    if server not in clients:
+        clients[server] = NtfyClient(server)
+    client = clients[server]
+    delay = BACKOFF_BASE
+
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(delay)
+            delay = min(delay * 2, BACKOFF_MAX)
+
+        try:
+            reply = client.publish(record.get("topic", NTFY_TOPIC), title, message,
+                                   record.get("priority", "default"))
+        except NtfyError as e:
+            error = e
+            if not e.retryable:
+                break
+            continue
+
+        log_line(f"Sent: {title} - {message} (id {reply['id']})")
+        return True
+
+    log_line(f"Failed: {title} ({error})")
+    return False
+
+class TokenBucket:
+    """Allows `burst` pushes at once, refilling at `rate` tokens per second"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Spend a token if one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def format_activity(activity):
+    """Work summary lines in the same style as notify-ntfy.py"""
+    lines = []
+    files_edited = activity.get("files_edited", [])
+    files_created = activity.get("files_created", [])
+    commands_run = activity.get("commands_run", 0)
+
+    # The name lists are a recent window; the counts are exact
+    edited_count = activity.get("files_edited_count", len(files_edited))
+    created_count = activity.get("files_created_count", len(files_created))
+
+    if files_edited:
+        if edited_count <= 3:
+            lines.append(f"📝 Edited: {', '.join(files_edited)}")
+        else:
+            lines.append(f"📝 Edited {edited_count} files")
+
+    if files_created:
+        if created_count <= 2:
+            lines.append(f"✨ Created: {', '.join(files_created)}")
+        else:
+            lines.append(f"✨ Created {created_count} files")
+
+    if commands_run:
+        lines.append(f"⚡ {commands_run} command{'s' if commands_run > 1 else ''}")
+
+    return lines
+
+def build_digest(records):
+    """Merge notifications held for one session and event into a single record"""
+    if len(records) == 1:
+        return records[0]
+
+    first = records[0]
+    count = len(records)
+    title = DIGEST_TITLES.get(first.get("event"), "🔔 {count} notifications").format(count=count)
+
+    # Session activity is cumulative, so the newest snapshot covers the burst
+    activity = {}
+    for record in records:
+        activity = record.get("activity") or activity
+
+    message_parts = []
+    work_done = format_activity(activity)
+    if work_done:
+        message_parts.append("📊 Work Done:")
+        message_parts.extend(work_done)
+        message_parts.append("")
+
+    labels = [record.get("label") or record.get("title", "") for record in records]
+    for label in labels[:DIGEST_MAX_LABELS]:
+        message_parts.append(f"• {label}")
+    if count > DIGEST_MAX_LABELS:
+        message_parts.append(f"… and {count - DIGEST_MAX_LABELS} more")
+
+    # Keep the hook's own timestamp line (and its time zone) from the newest record
+    stamp = records[-1].get("message", "").rsplit("\n", 1)[-1]
+    if stamp.startswith("⏰"):
+        message_parts.append(f"\n{stamp}")
+
+    priorities = [record.get("priority", "default") for record in records]
+    priority = max(priorities, key=lambda p: PRIORITIES.index(p) if p in PRIORITIES else 2)
+
+    return {
+        "title": title,
+        "message": "\n".join(message_parts),
+        "priority": priority,
+        "server": first.get("server", NTFY_SERVER),
+        "topic": first.get("topic", NTFY_TOPIC)
+    }
+
+def hold_record(pending, record, windows):
+    """Add a record to the digest pending for its session and event"""
+    key = (record.get("session", ""), record.get("event", ""))
+    if key not in pending:
+        due = time.monotonic() + windows.get(key[1], 0.0)
+        pending[key] = (due, [])
+    pending[key][1].append(record)
+
+def save_held(pending):
+    """Replace the held file with the records still pending (removed when none are)"""
+    held_path = get_held_path()
+    records = [record for _, records in pending.values() for record in records]
+    if not records:
+        try:
+            os.remove(held_path)
+        except FileNotFoundError:
+            pass
+        return
+
+    tmp_path = f"{held_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, held_path)
+
+def flush_pending(clients, pending, buckets, force=False):
+    """
+    Send held notifications whose window has passed and whose session has a
+    token; returns True if anything was sent (the held file is then stale)
+    """
+    now = time.monotonic()
+    sent = False
+    for key in list(pending):
+        due, records = pending[key]
+        if not force and now < due:
+            continue
+
+        session = key[0]
+        if session not in buckets:
+            buckets[session] = TokenBucket(RATE_PER_MINUTE / 60, RATE_BURST)
+        if not force and not buckets[session].take():
+            # Keep collecting until the session has a token again
+            continue
+
+        deliver(clients, build_digest(records))
+        del pending[key]
+        sent = True
+
+    return sent
+
+def run_sender():
+    """Drain the queue until it has been empty for IDLE_EXIT_SECONDS"""
+    clients = {}
+    pending = {}
+    buckets = {}
+    windows = load_coalesce_windows()
+    queue_path = get_queue_path()
+    idle_since = time.monotonic()
+
+    # Pick up what a sender that died was still holding
+    for record in read_records(get_held_path()):
+        hold_record(pending, record, windows)
+
+    try:
+        while pending or time.monotonic() - idle_since < IDLE_EXIT_SECONDS:
+            queued = os.path.exists(queue_path) or os.path.exists(queue_path + ".draining")
+            if queued:
+                with drain_journal(queue_path) as batch:
+                    for record in batch:
+                        hold_record(pending, record, windows)
+                    # The spool copy is only discarded once the batch is safe in the held file
+                    save_held(pending)
+
+            if flush_pending(clients, pending, buckets):
+                save_held(pending)
+
+            if queued or pending:
+                idle_since = time.monotonic()
+            time.sleep(POLL_INTERVAL)
+    finally:
+        # Do not drop held notifications on an orderly exit
+        flush_pending(clients, pending, buckets, force=True)
+        save_held(pending)
+        for client in clients.values():
+            client.close()
+
+
+def acquire_lock():
+    """Take the single-sender lock; returns the open lock file or None if held"""
+    os.makedirs(get_hooks_dir(), exist_ok=True)
+    lock = open(get_lock_path(), "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock
+
+def main():
+    if sys.argv[1:2] == ["--detach"]:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        sys.exit(0)
+
+    while True:
+        lock = acquire_lock()
+        if lock is None:
+            # Another sender is already draining the queue
+            sys.exit(0)
+
+        try:
+            run_sender()
+        finally:
+            lock.close()
+
+        # A hook that enqueued while we were exiting saw the lock held and
+        # did not start a sender; pick its notification up ourselves
+        if not (os.path.exists(get_queue_path()) or os.path.exists(get_held_path())):
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+ntfy Client
+Minimal stdlib HTTP client for publishing to an ntfy server.
+
+NtfyClient keeps one keep-alive connection open between publishes, so a
+resident process (ntfy-sender.py) pays for DNS, TCP and TLS setup once
+instead of once per notification. Connect and read timeouts are separate,
+and a publish only counts as delivered when the server answers 2xx with a
+JSON message carrying an id.
+"""
+
+import http.client
+import json
+from typing import Dict, Optional
+from urllib.parse import quote, urlencode, urlsplit
+
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 10.0
+
+
+class NtfyError(Exception):
+    """A publish that did not succeed; retryable tells the caller whether to try again"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = True):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class NtfyClient:
+    """Publishes messages to one ntfy server over a reusable connection."""
+
+    def __init__(self, server: str, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT):
+        parts = urlsplit(server)
+        self.secure = parts.scheme == "https"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.connection: Optional[http.client.HTTPConnection] = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """Open a connection using the connect timeout, then switch to the read timeout."""
+        if self.secure:
+            connection = http.client.HTTPSConnection(self.host, self.port, timeout=self.connect_timeout)
+        else:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.connect_timeout)
+        connection.connect()
+        connection.sock.settimeout(self.read_timeout)
+        return connection
+
+    def _post(self, path: str, body: bytes):
+        """Send one request; returns (status, body bytes, will_close)."""
+        if self.connection is None:
+            self.connection = self._connect()
+        self.connection.request("POST", path, body=body)
+        response = self.connection.getresponse()
+        return response.status, response.read(), response.will_close
+
+    def publish(self, topic: str, title: str, message: str, priority: str = "default") -> Dict:
+        """Publish one message and return the server's JSON reply; raises NtfyError."""
+        # Title and priority go in the query string: header values must be
+        # latin-1, and titles carry emoji
+        query = urlencode({"title": title, "priority": priority})
+        path = f"{self.base_path}/{quote(topic)}?{query}"
+        body = message.encode("utf-8")
+
+        reused = self.connection is not None
+        try:
+            status, data, will_close = self._post(path, body)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+            # The server may have closed an idle keep-alive connection; retry once fresh
+            self.close()
+            if not reused:
+                raise NtfyError(f"connection lost: {e}") from e
+            try:
+                status, data, will_close = self._post(path, body)
+            except (OSError, http.client.HTTPException) as retry_error:
+                self.close()
+                raise NtfyError(str(retry_error) or retry_error.__class__.__name__) from retry_error
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise NtfyError(str(e) or e.__class__.__name__) from e
+
+        if will_close:
+            self.close()
+
+        if not 200 <= status < 300:
+            # Client errors will not succeed on retry; throttling and server errors might
+            raise NtfyError(f"HTTP {status}", status, retryable=status >= 500 or status == 429)
+
+        try:
+            reply = json.loads(data)
+        except ValueError:
+            raise NtfyError("response is not JSON", status, retryable=False)
+
+        if not isinstance(reply, dict) or not reply.get("id"):
+            raise NtfyError("response has no message id", status, retryable=False)
+
+        return reply
+
+    def close(self) -> None:
+        """Close the connection; the next publish reconnects."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
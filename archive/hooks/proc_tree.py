@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Process Tree
+Read-only view of a hook's process ancestry, straight from /proc.
+
+Hooks are started by Claude Code through a shell, so the interesting facts
+about the session (which agent launched us, with which flags and command)
+live a few processes up the tree. ancestors() reads /proc/<pid>/stat and
+/proc/<pid>/cmdline once per process in a single bounded walk, and results
+are memoized for the life of the hook. Nothing here forks: on systems
+without /proc every lookup simply comes back empty.
+
+Long-lived processes (security-daemon.py) call forget() between requests so
+reused pids are never served from the memo.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import namedtuple
+
+# Upper bound on the ancestor walk
+MAX_ANCESTORS = 32
+
+# Interpreters that sit between Claude Code and the hook script
+SHELLS = frozenset({'sh', 'bash', 'dash', 'zsh', 'fish'})
+
+SKIP_PERMISSIONS_FLAG = '--dangerously-skip-permissions'
+
+
+class ProcessInfo(namedtuple('ProcessInfo', 'pid ppid comm start_time argv')):
+    """One process as seen in /proc
+
+    start_time is in clock ticks after boot and tells a reused pid apart.
+    """
+    __slots__ = ()
+
+    @property
+    def command(self) -> str:
+        return ' '.join(self.argv)
+
+    @property
+    def flags(self) -> tuple[str, ...]:
+        """The long options on the command line"""
+        return tuple(arg for arg in self.argv if arg.startswith('--'))
+
+    def has_flag(self, flag: str) -> bool:
+        return any(arg == flag or arg.startswith(flag + '=') for arg in self.argv)
+
+
+_processes: dict[int, ProcessInfo | None] = {}
+_ancestors: dict[int, tuple[ProcessInfo, ...]] = {}
+
+
+def read_process(pid: int) -> ProcessInfo | None:
+    """Return the process's stat and command line, or None if it cannot be read"""
+    if pid in _processes:
+        return _processes[pid]
+
+    info = None
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            cmdline = f.read()
+    except OSError:
+        pass
+    else:
+        # comm is parenthesised and may itself contain spaces or parentheses
+        comm_end = stat.rfind(b')')
+        fields = stat[comm_end + 2:].split()
+        info = ProcessInfo(
+            pid=pid,
+            ppid=int(fields[1]),
+            comm=stat[stat.find(b'(') + 1:comm_end].decode('utf-8', errors='replace'),
+            start_time=int(fields[19]),
+            argv=tuple(arg.decode('utf-8', errors='replace') for arg in cmdline.split(b'\0') if arg)
+        )
+
+    _processes[pid] = info
+    return info
+
+def ancestors(pid: int | None = None) -> tuple[ProcessInfo, ...]:
+    """The process and its ancestors, nearest first, stopping before init"""
+    pid = os.getpid() if pid is None else pid
+    if pid in _ancestors:
+        return _ancestors[pid]
+
+    chain = []
+    current = pid
+    while current > 1 and len(chain) < MAX_ANCESTORS:
+        info = read_process(current)
+        if info is None:
+            break
+        chain.append(info)
+        current = info.ppid
+
+    _ancestors[pid] = tuple(chain)
+    return _ancestors[pid]
+
+def agent_process(pid: int | None = None) -> ProcessInfo | None:
+    """The process that launched the hook: the first ancestor above it that is not a shell"""
+    # Walks only as far as needed, unlike ancestors()
+    info = read_process(os.getpid() if pid is None else pid)
+    for _ in range(MAX_ANCESTORS):
+        if info is None or info.ppid <= 1:
+            return None
+        info = read_process(info.ppid)
+        if info is not None and info.comm not in SHELLS:
+            return info
+    return None
+
+def skip_permissions(pid: int | None = None) -> bool:
+    """Whether any ancestor was started with --dangerously-skip-permissions"""
+    return any(info.has_flag(SKIP_PERMISSIONS_FLAG) for info in ancestors(pid))
+
+def forget() -> None:
+    """Drop memoized processes"""
+    _processes.clear()
+    _ancestors.clear()
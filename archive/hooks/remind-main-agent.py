@@ -15,16 +15,37 @@ Hook Behavior:
 
 Event Triggers: PreToolUse
 Action: Display reminder to log tasks
+
+Phase timings are recorded (hook_metrics.py) for events past the fast path,
+after the reminder has been printed.
 """
 
-import json
 import sys
+import time
+
+# List of significant tools that should trigger reminder
+SIGNIFICANT_TOOLS = [
+    "Write",       # File creation
+    "Edit",        # File modification
+    "MultiEdit",   # Multiple file edits
+    "Bash",        # Command execution
+    "TodoWrite"    # Task management
+]
 
 def main():
     """Main hook execution function."""
+    started = time.perf_counter()
+    raw_input = sys.stdin.buffer.read()
+
+    # Fast path: skip parsing (and importing json) unless a significant tool is named
+    if not any(f'"{tool}"'.encode() in raw_input for tool in SIGNIFICANT_TOOLS):
+        sys.exit(0)
+
+    parse_start = time.perf_counter()
+    import json
     try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        # Parse JSON input from stdin
+        input_data = json.loads(raw_input)
     except json.JSONDecodeError:
         # Exit silently on JSON parse errors
         sys.exit(0)
@@ -32,21 +53,20 @@ def main():
         # Exit silently on any other errors
         sys.exit(0)
 
+    parse_time = time.perf_counter() - parse_start
+
     # Check if this is a PreToolUse event
     tool_name = input_data.get("tool_name", "")
 
-    # List of significant tools that should trigger reminder
-    significant_tools = [
-        "Write",       # File creation
-        "Edit",        # File modification
-        "MultiEdit",   # Multiple file edits
-        "Bash",        # Command execution
-        "TodoWrite"    # Task management
-    ]
-
     # Display reminder for significant operations
-    if tool_name in significant_tools:
+    if tool_name in SIGNIFICANT_TOOLS:
         print("📝 Remember to log this task in .claude/logs/TASKLOG.md")
+    sys.stdout.flush()
+
+    from hook_metrics import HookMetrics
+    metrics = HookMetrics("remind-main-agent", started)
+    metrics.add("parse", parse_time)
+    metrics.flush(input_data.get("hook_event_name", ""))
 
     # Exit cleanly to allow tool execution to proceed
     sys.exit(0)
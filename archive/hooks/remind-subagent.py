@@ -4,27 +4,45 @@ Remind Subagent Hook
 
 A lightweight hook that reminds agents to log tasks in TASKLOG.md when subagents are launched.
 This hook triggers on PreToolUse event for Task tool calls and displays a simple reminder message.
+Phase timings are recorded (hook_metrics.py) for events past the fast path, after the reminder.
 """
 
-import json
 import sys
+import time
 
 
 def main():
     """Main hook execution function."""
+    started = time.perf_counter()
+    raw_input = sys.stdin.buffer.read()
+
+    # Fast path: skip parsing (and importing json) unless a Task call is possible
+    if b'"Task"' not in raw_input:
+        sys.exit(0)
+
+    parse_start = time.perf_counter()
+    import json
     try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        # Parse JSON input from stdin
+        input_data = json.loads(raw_input)
     except json.JSONDecodeError:
         # Exit silently if JSON is invalid - don't interfere with tool execution
         sys.exit(0)
 
+    parse_time = time.perf_counter() - parse_start
+
     # Check if this is a Task tool (subagent launch)
     tool_name = input_data.get("tool_name", "")
 
     if tool_name == "Task":
         # Display the reminder message to stdout so it appears in the console
         print("📝 Remember to log this task in .claude/logs/TASKLOG.md")
+    sys.stdout.flush()
+
+    from hook_metrics import HookMetrics
+    metrics = HookMetrics("remind-subagent", started)
+    metrics.add("parse", parse_time)
+    metrics.flush(input_data.get("hook_event_name", ""))
 
     # Exit with code 0 to allow the tool execution to proceed normally
     sys.exit(0)
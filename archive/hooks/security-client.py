@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+PreToolUse Hook: security daemon client
+
+Forwards the hook event to security-daemon.py over a Unix socket and prints
+its decision. Only os, socket, sys, time and security_socket (stat, struct,
+zlib) are imported on this path; if the daemon is not running, security.py is
+imported and evaluates the event in-process instead. Metrics are recorded only
+after the reply is written.
+
+The socket lives in a per-user directory that must be owned by us with mode
+0700, and the process answering on it must run as our uid (see
+security_socket.py); otherwise the daemon is treated as down rather than
+trusting another user's decisions.
+"""
+import os
+import socket
+import sys
+import time
+
+from security_socket import get_socket_path, is_private_dir, peer_uid
+
+# Give up on the daemon quickly and fall back to in-process evaluation
+CONNECT_TIMEOUT = 0.05
+RESPONSE_TIMEOUT = 4.0
+
+
+def ask_daemon(raw_input):
+    """Send the raw event to the daemon and return its reply"""
+    socket_path = get_socket_path()
+    if not is_private_dir(os.path.dirname(socket_path)):
+        raise PermissionError(f"untrusted socket directory for {socket_path}")
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path)
+        if peer_uid(sock) != os.getuid():
+            raise PermissionError(f"{socket_path} is served by another user")
+        sock.settimeout(RESPONSE_TIMEOUT)
+        sock.sendall(raw_input)
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        sock.close()
+
+def main():
+    raw_input = sys.stdin.buffer.read()
+
+    start = time.perf_counter()
+    try:
+        reply = ask_daemon(raw_input)
+    except OSError:
+        reply = None
+    elapsed = time.perf_counter() - start
+
+    if reply is not None:
+        sys.stdout.buffer.write(reply)
+        sys.stdout.flush()
+        sys.stdout.close()
+
+        from hook_metrics import HookMetrics
+        metrics = HookMetrics("security-client")
+        metrics.add("daemon", elapsed)
+        metrics.flush("PreToolUse")
+        sys.exit(0)
+
+    # Daemon is down - evaluate in this process
+    import security
+    security.main(raw_input)
+
+
+if __name__ == "__main__":
+    main()
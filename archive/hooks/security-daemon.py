@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Security Daemon: resident PreToolUse evaluator for security.py
+
+Keeps the compiled security policy warm in a long-lived process listening on
+a Unix socket, so each PreToolUse call only pays for the tiny client shim
+(security-client.py) instead of interpreter startup, imports and policy
+compilation. The policy is reloaded when the rules file changes and the
+daemon exits on its own after IDLE_TIMEOUT_SECONDS without requests.
+
+The socket is created in a per-user 0700 directory (see security_socket.py);
+the daemon refuses to start if that directory belongs to someone else or is
+open to other users.
+
+The daemon is opt-in: the SessionStart hook runs --detach, which only starts
+it when SECURITY_DAEMON=1 is set. Without it security-client.py finds no
+socket and evaluates every event in-process, exactly like security.py.
+
+Usage:
+    python3 security-daemon.py            # run in the foreground
+    python3 security-daemon.py --detach   # start in the background if enabled (no-op if running)
+"""
+
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+import proc_tree
+import security
+from hook_metrics import HookMetrics
+from security_socket import get_socket_path, is_private_dir, peer_credentials, peer_uid
+
+# Exit after this long without a request
+IDLE_TIMEOUT_SECONDS = 30 * 60
+
+# Set to 1 to let the SessionStart hook start the daemon
+ENABLED = os.environ.get("SECURITY_DAEMON") == "1"
+
+
+def rules_signature():
+    """Identify the current rules file version without reading it"""
+    rules_file = security.find_rules_file()
+    if rules_file is None:
+        return None
+    try:
+        stat = rules_file.stat()
+    except OSError:
+        return None
+    return (str(rules_file), stat.st_mtime_ns, stat.st_size)
+
+
+class SecurityRequestHandler(socketserver.StreamRequestHandler):
+    """Evaluate one forwarded hook event and reply with the decision JSON"""
+
+    def handle(self):
+        start_time = time.time()
+        metrics = HookMetrics("security-daemon")
+        with metrics.phase("policy"):
+            self.server.refresh_policy()
+
+        try:
+            with metrics.phase("parse"):
+                input_data = json.loads(self.rfile.read())
+            with metrics.phase("match"):
+                output, event = security.evaluate_event(input_data, start_time)
+        except Exception as e:
+            # Empty reply: the client exits 0 without a decision, like security.py
+            security.log_hook_error(e)
+            return
+
+        # The client exits as soon as it has the reply, so note its parent now;
+        # the rest of the tree is walked after replying
+        with self.server.proc_tree_lock:
+            # Pids are reused over the daemon's lifetime
+            proc_tree.forget()
+            client = proc_tree.read_process(self.client_pid())
+
+        # Send the decision and EOF first, then log off the client's critical path
+        self.wfile.write(json.dumps(output).encode("utf-8"))
+        self.wfile.flush()
+        self.request.shutdown(socket.SHUT_WR)
+
+        with metrics.phase("log_write"):
+            with self.server.proc_tree_lock:
+                skip_permissions = client is not None and proc_tree.skip_permissions(client.ppid)
+            security.log_security_event(*event, skip_permissions=skip_permissions)
+        metrics.flush(input_data.get("hook_event_name", ""))
+
+    def client_pid(self):
+        """pid of the connected security-client.py, from the socket's peer credentials"""
+        return peer_credentials(self.request)[0]
+
+
+class SecurityDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Handlers run on their own threads: the proc_tree memo is only touched
+    under proc_tree_lock, and a changed policy is built in full before it
+    replaces the old one.
+    """
+    daemon_threads = True
+    timeout = IDLE_TIMEOUT_SECONDS
+
+    def __init__(self, socket_path):
+        self.idle = False
+        self.proc_tree_lock = threading.Lock()
+        self.policy_lock = threading.Lock()
+        self.policy_signature = rules_signature()
+        security.get_policy()  # Compile once up front
+        super().__init__(socket_path, SecurityRequestHandler)
+
+    def refresh_policy(self):
+        """Swap in a freshly built policy when the rules file has changed"""
+        with self.policy_lock:
+            signature = rules_signature()
+            if signature != self.policy_signature:
+                security.reload_policy()
+                self.policy_signature = signature
+
+    def handle_timeout(self):
+        self.idle = True
+
+
+def daemon_running(socket_path):
+    """Check if another daemon of ours is accepting connections on the socket"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return peer_uid(sock) == os.getuid()
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+def main():
+    detach = sys.argv[1:2] == ["--detach"]
+    if detach and not ENABLED:
+        sys.exit(0)
+
+    socket_path = get_socket_path()
+    socket_dir = os.path.dirname(socket_path)
+
+    try:
+        os.mkdir(socket_dir, 0o700)
+    except FileExistsError:
+        pass
+    if not is_private_dir(socket_dir):
+        print(f"Not starting: {socket_dir} must be a directory owned by this user with mode 0700",
+              file=sys.stderr)
+        sys.exit(1)
+
+    if daemon_running(socket_path):
+        sys.exit(0)
+
+    if detach:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        sys.exit(0)
+
+    # Remove a stale socket left by a crashed daemon
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+
+    server = SecurityDaemon(socket_path)
+    os.chmod(socket_path, 0o600)
+    try:
+        while not server.idle:
+            server.handle_request()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
 #!/usr/bin/env python3
 """
 PreToolUse Hook: Enhanced security validation using unified logger
+
+Patterns come from the built-in tables below or from a project rules file
+(.claude/security-rules.json/.toml/.yaml); the compiled policy is cached in
+.claude/cache/security-policy.json keyed by the rules file's mtime and hash.
+
+The allow/deny decision is printed before anything is logged. Events are
+then appended to the bounded .claude/logs/security.jsonl spool in O(1); the
+grouped, newest-first SECURITY.log view is rendered on demand with --render.
 """
 import json
 import sys
@@ -10,10 +18,14 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+import proc_tree
+from hook_metrics import HookMetrics
+from journal import append_record, claim_drop_count, clear_drop_count, drain_journal, record_drop
+
 
 # Removed UnifiedLogger - now using simple file logging
 
-# Risk scoring system
+# Risk scoring system (built-in default, overridable by the rules file)
 RISK_SCORES = {
     "low": 1,
     "medium": 5,
@@ -54,10 +66,27 @@ DANGEROUS_PATTERNS = {
     "file_patterns": {}  # Don't block files by pattern alone
 }
 
+# Project rules files searched in order; YAML needs PyYAML installed
+RULES_FILE_NAMES = ["security-rules.json", "security-rules.toml", "security-rules.yaml", "security-rules.yml"]
+POLICY_CACHE_VERSION = 1
+
+# Unrendered events kept in the spool before new ones are dropped (and counted)
+SPOOL_MAX_BYTES = 5 * 1024 * 1024
+
+# SECURITY.log is rotated into SECURITY.log.1 ... SECURITY.log.N once it reaches
+# LOG_MAX_BYTES; older segments are gzipped unless SECURITY_LOG_GZIP=0
+LOG_MAX_BYTES = 1024 * 1024
+LOG_KEEP_SEGMENTS = 5
+LOG_COMPRESS_SEGMENTS = os.environ.get("SECURITY_LOG_GZIP", "1") != "0"
+
+def get_logs_dir():
+    """Return the project's .claude/logs directory"""
+    project_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR", "."))
+    return project_dir / ".claude" / "logs"
+
 def ensure_log_file():
     """Ensure security log file exists with header"""
-    project_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR", "."))
-    logs_dir = project_dir / ".claude" / "logs"
+    logs_dir = get_logs_dir()
     logs_dir.mkdir(parents=True, exist_ok=True)
     log_file = logs_dir / "SECURITY.log"
 
@@ -88,11 +117,217 @@ def calculate_risk_score(matches):
     for match in matches:
         risk_level = match.get("risk", "low")
         category = match.get("category", "unknown")
-        total_score += RISK_SCORES.get(risk_level, 1)
+        total_score += get_policy().risk_scores.get(risk_level, 1)
         categories.add(category)
     
     return total_score, list(categories)
 
+class PatternMatcher:
+    """Finds every pattern of a table that occurs in a text with one regex pass"""
+
+    def __init__(self, patterns, ignore_case=False):
+        self.ignore_case = ignore_case
+        self.order = {pattern: i for i, pattern in enumerate(patterns)}
+
+        # Normalized key -> original table patterns (case variants share a key)
+        self.originals = {}
+        for pattern in patterns:
+            key = pattern.lower() if ignore_case else pattern
+            self.originals.setdefault(key, []).append(pattern)
+
+        # Longest first, so the lookahead reports the longest pattern starting
+        # at each position; any shorter hit at that position is its prefix
+        keys = sorted(self.originals, key=len, reverse=True)
+        self.prefixes = {key: [other for other in keys if other != key and key.startswith(other)] for key in keys}
+        self.regex = re.compile("|".join(re.escape(key) for key in keys)) if keys else None
+
+    def find_all(self, text):
+        """Return the table patterns found in text, in table order"""
+        if not self.regex or not text:
+            return []
+
+        if self.ignore_case:
+            text = text.lower()
+
+        found = set()
+        match = self.regex.search(text)
+        while match:
+            key = match.group()
+            if key not in found:
+                found.add(key)
+                found.update(self.prefixes[key])
+            # Resume one character later so overlapping patterns are not missed
+            match = self.regex.search(text, match.start() + 1)
+
+        patterns = [pattern for key in found for pattern in self.originals[key]]
+        return sorted(patterns, key=self.order.get)
+
+    def to_dict(self):
+        """Serialize the compiled tables for the on-disk policy cache"""
+        return {
+            "ignore_case": self.ignore_case,
+            "patterns": list(self.order),
+            "originals": self.originals,
+            "prefixes": self.prefixes,
+            "regex": self.regex.pattern if self.regex else None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a matcher from the cache without re-sorting or re-lowercasing"""
+        matcher = cls.__new__(cls)
+        matcher.ignore_case = data["ignore_case"]
+        matcher.order = {pattern: i for i, pattern in enumerate(data["patterns"])}
+        matcher.originals = data["originals"]
+        matcher.prefixes = data["prefixes"]
+        matcher.regex = re.compile(data["regex"]) if data["regex"] else None
+        return matcher
+
+
+class SecurityPolicy:
+    """Risk scores, pattern tables and their compiled matchers"""
+
+    def __init__(self, risk_scores, patterns, path_matcher=None, command_matcher=None):
+        self.risk_scores = risk_scores
+        self.patterns = patterns
+        self.path_matcher = path_matcher or PatternMatcher(list(patterns["paths"]))
+        self.command_matcher = command_matcher or PatternMatcher(list(patterns["commands"]), ignore_case=True)
+
+    @classmethod
+    def from_rules(cls, rules):
+        """Build a policy from a rules mapping; sections it defines replace the built-ins"""
+        if not isinstance(rules, dict):
+            raise ValueError("Security rules must be a mapping")
+
+        risk_scores = dict(RISK_SCORES)
+        risk_scores.update(rules.get("risk_scores", {}))
+
+        patterns = {}
+        for section in ("paths", "commands"):
+            table = rules.get(section, DANGEROUS_PATTERNS[section])
+            for pattern, details in table.items():
+                if not isinstance(details, dict) or "risk" not in details or "category" not in details:
+                    raise ValueError(f"Invalid rule for {section} pattern {pattern!r}")
+            patterns[section] = table
+
+        return cls(risk_scores, patterns)
+
+    def to_dict(self):
+        return {
+            "risk_scores": self.risk_scores,
+            "patterns": self.patterns,
+            "path_matcher": self.path_matcher.to_dict(),
+            "command_matcher": self.command_matcher.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["risk_scores"],
+            data["patterns"],
+            PatternMatcher.from_dict(data["path_matcher"]),
+            PatternMatcher.from_dict(data["command_matcher"])
+        )
+
+
+def find_rules_file():
+    """Return the project's security rules file, if any"""
+    override = os.environ.get("SECURITY_RULES_FILE")
+    if override:
+        return Path(override)
+
+    claude_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR", ".")) / ".claude"
+    for name in RULES_FILE_NAMES:
+        rules_file = claude_dir / name
+        if rules_file.exists():
+            return rules_file
+
+    return None
+
+def parse_rules(rules_file, raw):
+    """Parse rules file content according to its extension"""
+    suffix = rules_file.suffix.lower()
+    if suffix == ".toml":
+        import tomllib
+        return tomllib.loads(raw.decode("utf-8"))
+    if suffix in (".yaml", ".yml"):
+        import yaml  # Optional dependency, only needed for YAML rules
+        return yaml.safe_load(raw)
+    return json.loads(raw)
+
+def load_policy():
+    """Load the compiled policy from cache, rebuilding it when the rules file changes"""
+    rules_file = find_rules_file()
+    if rules_file is None:
+        return SecurityPolicy(RISK_SCORES, DANGEROUS_PATTERNS)
+
+    cache_file = get_logs_dir().parent / "cache" / "security-policy.json"
+    stat = rules_file.stat()
+
+    cached = None
+    try:
+        with open(cache_file, "r") as f:
+            cached = json.load(f)
+        if cached.get("version") != POLICY_CACHE_VERSION or cached.get("source") != str(rules_file):
+            cached = None
+    except (OSError, ValueError):
+        cached = None
+
+    # Unchanged mtime and size: trust the cache without reading the rules file
+    if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+        return SecurityPolicy.from_dict(cached["policy"])
+
+    import hashlib
+    raw = rules_file.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if cached and cached["sha256"] == digest:
+        # Touched but not modified - reuse the compiled policy
+        policy = SecurityPolicy.from_dict(cached["policy"])
+    else:
+        policy = SecurityPolicy.from_rules(parse_rules(rules_file, raw))
+
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({
+                "version": POLICY_CACHE_VERSION,
+                "source": str(rules_file),
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "policy": policy.to_dict()
+            }, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+
+    return policy
+
+_policy = None
+
+def build_policy():
+    """Load the policy, falling back to the built-in rules if the rules file is broken"""
+    try:
+        return load_policy()
+    except Exception as e:
+        # A broken rules file must not disable the built-in protections
+        print(f"Invalid security rules, using built-in policy: {e}", file=sys.stderr)
+        return SecurityPolicy(RISK_SCORES, DANGEROUS_PATTERNS)
+
+def get_policy():
+    """Return the process-wide policy, loading it on first use"""
+    global _policy
+    if _policy is None:
+        _policy = build_policy()
+    return _policy
+
+def reload_policy():
+    """Replace the process-wide policy; readers see the old or the new one, never None"""
+    global _policy
+    _policy = build_policy()
+
 def check_dangerous_path(file_path):
     """Check if a file path is potentially dangerous with risk assessment"""
     if not file_path:
@@ -100,23 +335,24 @@ def check_dangerous_path(file_path):
 
     matches = []
 
+    # Allow if it's in project directory (.claude, src, etc)
+    if "/.claude/" in file_path or "/src/" in file_path or "/tests/" in file_path:
+        return False, "", []
+
     # Only check for ACTUAL dangerous paths (exact matches or critical system files)
-    for pattern, details in DANGEROUS_PATTERNS["paths"].items():
-        # For system paths, require exact match or directory prefix
-        if pattern in file_path:
-            # Allow if it's in project directory (.claude, src, etc)
-            if "/.claude/" in file_path or "/src/" in file_path or "/tests/" in file_path:
-                continue
-            matches.append({
-                "pattern": pattern,
-                "risk": details["risk"],
-                "category": details["category"],
-                "reason": f"Attempting to modify critical system file: {pattern}"
-            })
+    policy = get_policy()
+    for pattern in policy.path_matcher.find_all(file_path):
+        details = policy.patterns["paths"][pattern]
+        matches.append({
+            "pattern": pattern,
+            "risk": details["risk"],
+            "category": details["category"],
+            "reason": f"Attempting to modify critical system file: {pattern}"
+        })
 
     if matches:
         risk_score, categories = calculate_risk_score(matches)
-        should_block = risk_score >= RISK_SCORES["critical"]  # Only block CRITICAL paths
+        should_block = risk_score >= policy.risk_scores["critical"]  # Only block CRITICAL paths
         reason = "; ".join([m["reason"] for m in matches])
         return should_block, reason, matches
 
@@ -127,56 +363,62 @@ def check_dangerous_command(command):
     if not command:
         return False, "", []
 
-    cmd_lower = command.lower()
     matches = []
 
-    # Only check for TRULY dangerous command patterns
-    for pattern, details in DANGEROUS_PATTERNS["commands"].items():
-        if pattern.lower() in cmd_lower:
-            matches.append({
-                "pattern": pattern,
-                "risk": details["risk"],
-                "category": details["category"],
-                "reason": f"CRITICAL: System-damaging command detected: {pattern}"
-            })
+    # Only check for TRULY dangerous command patterns (single case-insensitive pass)
+    policy = get_policy()
+    for pattern in policy.command_matcher.find_all(command):
+        details = policy.patterns["commands"][pattern]
+        matches.append({
+            "pattern": pattern,
+            "risk": details["risk"],
+            "category": details["category"],
+            "reason": f"CRITICAL: System-damaging command detected: {pattern}"
+        })
 
     if matches:
         risk_score, categories = calculate_risk_score(matches)
         # Only block CRITICAL commands that can actually destroy the system
-        should_block = risk_score >= RISK_SCORES["critical"]
+        should_block = risk_score >= policy.risk_scores["critical"]
         reason = "; ".join([m["reason"] for m in matches])
         return should_block, reason, matches
 
     return False, "", []
 
-def rotate_log_if_needed(log_file, max_entries=1000):
-    """Rotate log file if it exceeds max entries"""
+def segment_path(log_file, number, compressed):
+    """Return the path of a numbered archive segment (SECURITY.log.N[.gz])"""
+    return log_file.with_name(f"{log_file.name}.{number}{'.gz' if compressed else ''}")
+
+def rotate_log_if_needed(log_file, max_bytes=LOG_MAX_BYTES, keep_segments=LOG_KEEP_SEGMENTS,
+                         compress=LOG_COMPRESS_SEGMENTS):
+    """Rotate log file into numbered segments once it reaches max_bytes"""
     try:
-        if not log_file.exists():
+        # Cheap size check - the log is never read to decide
+        if not log_file.exists() or log_file.stat().st_size < max_bytes:
             return
 
-        with open(log_file, "r") as f:
-            lines = f.readlines()
-
-        # Find where entries start (after the header)
-        entry_start_idx = 0
-        for i, line in enumerate(lines):
-            if line.strip() == "---":
-                entry_start_idx = i + 1
-                break
-
-        # Count actual log entries (non-empty lines after header)
-        entries = [line for line in lines[entry_start_idx:] if line.strip()]
-
-        # If exceeds max, keep only the header and last max_entries
-        if len(entries) > max_entries:
-            header = lines[:entry_start_idx]
-            recent_entries = entries[-max_entries:]
-
-            with open(log_file, "w") as f:
-                f.writelines(header)
-                f.write("\n")
-                f.writelines(recent_entries)
+        # Drop the oldest segment, then shift the rest up by one
+        for compressed in (False, True):
+            oldest = segment_path(log_file, keep_segments, compressed)
+            if oldest.exists():
+                oldest.unlink()
+
+        for number in range(keep_segments - 1, 0, -1):
+            for compressed in (False, True):
+                segment = segment_path(log_file, number, compressed)
+                if segment.exists():
+                    segment.rename(segment_path(log_file, number + 1, compressed))
+
+        # Current log becomes segment 1; a fresh log gets its header on next write
+        newest = segment_path(log_file, 1, False)
+        log_file.rename(newest)
+
+        if compress:
+            import gzip
+            import shutil
+            with open(newest, "rb") as src, gzip.open(segment_path(log_file, 1, True), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            newest.unlink()
 
     except Exception:
         # Fail silently
@@ -196,20 +438,23 @@ def sanitize_and_truncate(text, max_length=80):
 
     return text
 
-def log_security_event(session_id, tool_name, tool_input, analysis_result):
-    """Log security event to SECURITY.log in markdown format"""
+def log_security_event(session_id, tool_name, tool_input, analysis_result, skip_permissions=None):
+    """
+    Append security event to the security journal (rendered into SECURITY.log later).
+    skip_permissions defaults to checking this process's ancestors; the daemon
+    passes what it found for its client.
+    """
     try:
         now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
-        time_str = now.strftime("%H:%M:%S")
 
         # Determine risk level and type
+        risk_scores = get_policy().risk_scores
         risk_score = analysis_result["risk_score"]
-        if risk_score >= RISK_SCORES["critical"]:
+        if risk_score >= risk_scores["critical"]:
             risk_level = "CRITICAL"
-        elif risk_score >= RISK_SCORES["high"]:
+        elif risk_score >= risk_scores["high"]:
             risk_level = "HIGH"
-        elif risk_score >= RISK_SCORES["medium"]:
+        elif risk_score >= risk_scores["medium"]:
             risk_level = "MEDIUM"
         else:
             risk_level = "LOW"
@@ -233,86 +478,159 @@ def log_security_event(session_id, tool_name, tool_input, analysis_result):
         # Get categories
         categories = ", ".join(analysis_result["risk_categories"]) if analysis_result["risk_categories"] else "none"
 
-        # Get log file path
-        log_file = ensure_log_file()
-
-        # Format log entry (TIME | TYPE | DESCRIPTION | FILE_PATH | AGENT | SESSION | RISK_SCORE | CATEGORIES | DECISION_TIME | MATCHES)
-        log_entry = f"- {time_str} | {event_type} | {description} | {file_path} | {tool_name} | {session_id} | {risk_score} | {categories} | {analysis_result['decision_time_ms']}ms | {len(analysis_result['matches'])}\n"
-
-        # Read existing content
-        with open(log_file, "r") as f:
-            lines = f.readlines()
-
-        # Find where entries section starts (after "---")
-        entries_start_idx = 0
-        for i, line in enumerate(lines):
-            if line.strip() == "---":
-                entries_start_idx = i + 1
-                break
-
-        # Check if today's date header exists
-        date_header_idx = -1
-        for i in range(entries_start_idx, len(lines)):
-            if f"### {date_str}" in lines[i]:
-                date_header_idx = i
-                break
-
-        # Rotate log if needed (every 10th write to reduce I/O)
-        import random
-        if random.randint(1, 10) == 1:
-            rotate_log_if_needed(log_file, max_entries=1000)
-
-        # Insert entry at the top
-        if date_header_idx != -1:
-            # Date header exists, insert entry right after it
-            # Skip the date header line and any blank lines
-            insert_idx = date_header_idx + 1
-            while insert_idx < len(lines) and lines[insert_idx].strip() == "":
-                insert_idx += 1
-            lines.insert(insert_idx, log_entry)
-        else:
-            # Create new date header at the top of entries
-            new_section = ["\n", f"### {date_str}\n", "\n", log_entry]
-            # Insert after entries_start_idx, skipping any blank lines
-            insert_idx = entries_start_idx
-            while insert_idx < len(lines) and lines[insert_idx].strip() == "":
-                insert_idx += 1
-            for item in reversed(new_section):
-                lines.insert(insert_idx, item)
-
-        # Write back to file
-        with open(log_file, "w") as f:
-            f.writelines(lines)
+        record = {
+            "date": now.strftime("%Y-%m-%d"),
+            "time": now.strftime("%H:%M:%S"),
+            "type": event_type,
+            "description": description,
+            "file_path": file_path,
+            "tool": tool_name,
+            "session": session_id,
+            "risk_score": risk_score,
+            "categories": categories,
+            "decision_time_ms": analysis_result["decision_time_ms"],
+            "matches": len(analysis_result["matches"])
+        }
+        if skip_permissions is None:
+            skip_permissions = proc_tree.skip_permissions()
+        # Nobody confirms tool calls in this mode, so flag it in the log
+        record["mode"] = "skip-permissions" if skip_permissions else "default"
+
+        # Single O(1) append - no read-modify-write on the PreToolUse path
+        journal_path = str(get_logs_dir() / "security.jsonl")
+        if not append_record(journal_path, record, max_bytes=SPOOL_MAX_BYTES):
+            dropped = record_drop(journal_path)
+            print(f"Security spool full: {dropped} event(s) dropped until next --render", file=sys.stderr)
 
     except Exception:
         # Fail silently
         pass
 
+def format_log_entry(record):
+    """Format a journal record as a SECURITY.log line"""
+    # TIME | TYPE | DESCRIPTION | FILE_PATH | AGENT | SESSION | RISK_SCORE | CATEGORIES | DECISION_TIME | MATCHES
+    description = record['description']
+    if record.get('mode') == 'skip-permissions':
+        description += " [skip-permissions]"
+    return f"- {record['time']} | {record['type']} | {description} | {record['file_path']} | {record['tool']} | {record['session']} | {record['risk_score']} | {record['categories']} | {record['decision_time_ms']}ms | {record['matches']}\n"
+
+def insert_log_entry(lines, date_str, log_entry):
+    """Insert an entry at the top of its date section (newest first)"""
+    # Find where entries section starts (after "---")
+    entries_start_idx = 0
+    for i, line in enumerate(lines):
+        if line.strip() == "---":
+            entries_start_idx = i + 1
+            break
+
+    # Check if the date header exists
+    date_header_idx = -1
+    for i in range(entries_start_idx, len(lines)):
+        if f"### {date_str}" in lines[i]:
+            date_header_idx = i
+            break
+
+    # Insert entry at the top
+    if date_header_idx != -1:
+        # Date header exists, insert entry right after it
+        # Skip the date header line and any blank lines
+        insert_idx = date_header_idx + 1
+        while insert_idx < len(lines) and lines[insert_idx].strip() == "":
+            insert_idx += 1
+        lines.insert(insert_idx, log_entry)
+    else:
+        # Create new date header at the top of entries
+        new_section = ["\n", f"### {date_str}\n", "\n", log_entry]
+        # Insert after entries_start_idx, skipping any blank lines
+        insert_idx = entries_start_idx
+        while insert_idx < len(lines) and lines[insert_idx].strip() == "":
+            insert_idx += 1
+        for item in reversed(new_section):
+            lines.insert(insert_idx, item)
+
+def render_security_log():
+    """Fold pending journal records into SECURITY.log, grouped by date, newest first"""
+    try:
+        journal_path = str(get_logs_dir() / "security.jsonl")
+        with drain_journal(journal_path) as records:
+            # Only cleared once the alert is written, so a failed render
+            # reports the same drops next time
+            dropped = claim_drop_count(journal_path)
+            if dropped:
+                # Report overflow as its own entry so gaps in the log are visible
+                now = datetime.now()
+                records.append({
+                    "date": now.strftime("%Y-%m-%d"),
+                    "time": now.strftime("%H:%M:%S"),
+                    "type": "Alert",
+                    "description": f"DROPPED {dropped} EVENTS - SPOOL OVERFLOW",
+                    "file_path": "N/A",
+                    "tool": "security",
+                    "session": "N/A",
+                    "risk_score": 0,
+                    "categories": "spool_overflow",
+                    "decision_time_ms": 0,
+                    "matches": 0
+                })
+
+            if not records:
+                return
+
+            # Start a new segment first if the current log is already full
+            rotate_log_if_needed(get_logs_dir() / "SECURITY.log")
+            log_file = ensure_log_file()
+
+            # Read existing content once for the whole batch
+            with open(log_file, "r") as f:
+                lines = f.readlines()
+
+            # Records are chronological, so each insert lands above the previous one
+            for record in records:
+                insert_log_entry(lines, record["date"], format_log_entry(record))
+
+            # Write back to file
+            with open(log_file, "w") as f:
+                f.writelines(lines)
 
-try:
-    # Start timing for performance metrics
-    start_time = time.time()
-    
-    # Load input from stdin
-    input_data = json.load(sys.stdin)
-    
+            if dropped:
+                clear_drop_count(journal_path)
+
+    except Exception as e:
+        print(f"Error rendering security log: {e}", file=sys.stderr)
+
+
+def log_hook_error(error):
+    """Record a hook failure in errors.log without blocking execution"""
+    try:
+        error_log = get_logs_dir() / "errors.log"
+        error_log.parent.mkdir(parents=True, exist_ok=True)
+        with open(error_log, "a") as f:
+            f.write(f"{datetime.now().isoformat()} - Surveillance security hook error: {str(error)}\n")
+    except:
+        pass  # Fail silently if error logging fails
+
+def evaluate_event(input_data, start_time):
+    """
+    Analyze one PreToolUse event.
+    Returns (decision output, log_security_event arguments); raises ValueError on invalid input.
+    """
     # Validate input structure
     if not isinstance(input_data, dict):
         raise ValueError("Invalid input: expected dictionary")
-    
+
     # Extract and validate data
     session_id = input_data.get("session_id", "")
     if session_id and not re.match(r'^[a-zA-Z0-9\-_]+$', session_id):
         raise ValueError("Invalid session_id format")
-    
+
     tool_name = input_data.get("tool_name", "")
     if tool_name and not re.match(r'^[A-Za-z]+$', tool_name):
         raise ValueError("Invalid tool_name format")
-    
+
     tool_input = input_data.get("tool_input", {})
     if not isinstance(tool_input, dict):
         raise ValueError("Invalid tool_input: expected dictionary")
-    
+
     # Initialize analysis result
     analysis_result = {
         "blocked": False,
@@ -322,7 +640,7 @@ try:
         "reason": "",
         "decision_time_ms": 0
     }
-    
+
     # Perform security analysis based on tool type
     if tool_name in ["Write", "Edit", "MultiEdit"]:
         file_path = tool_input.get("file_path", "")
@@ -336,7 +654,7 @@ try:
                 "matches": matches,
                 "reason": reason
             })
-            
+
     elif tool_name == "Bash":
         command = tool_input.get("command", "")
         should_block, reason, matches = check_dangerous_command(command)
@@ -349,14 +667,11 @@ try:
                 "matches": matches,
                 "reason": reason
             })
-    
+
     # Calculate decision time
     decision_time = (time.time() - start_time) * 1000
     analysis_result["decision_time_ms"] = round(decision_time, 2)
-    
-    # Log to date-based folders
-    log_security_event(session_id, tool_name, tool_input, analysis_result)
-    
+
     # Handle blocking decision
     if analysis_result["blocked"]:
         # Return JSON to block with detailed feedback
@@ -367,21 +682,69 @@ try:
                 "permissionDecisionReason": f"Security Policy Violation: {analysis_result['reason']} (Risk Score: {analysis_result['risk_score']})"
             }
         }
-        print(json.dumps(output))
+    else:
+        # Allow the operation - suppress output
+        output = {"suppressOutput": True}
+
+    return output, (session_id, tool_name, tool_input, analysis_result)
+
+metrics = HookMetrics("security")
+
+def handle(input_data):
+    """Dispatcher entry point: render the log on Stop (PreToolUse goes through security-client.py)"""
+    if input_data.get("hook_event_name") == "Stop":
+        with metrics.phase("render"):
+            render_security_log()
+    return None
+
+def detach_stdio():
+    """Point stdin/stdout/stderr at /dev/null so the hook's pipes see EOF"""
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+
+def main(raw_input=None):
+    """Main hook execution function (raw_input is passed by the daemon client fallback)"""
+    # Manual rendering: security.py --render
+    if sys.argv[1:2] == ["--render"]:
+        with metrics.phase("render"):
+            render_security_log()
+        metrics.flush("Stop")
         sys.exit(0)
-    
-    # Allow the operation - suppress output
-    print(json.dumps({"suppressOutput": True}))
-    sys.exit(0)
-    
-except Exception as e:
-    # Log error but don't block execution
+
     try:
-        project_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR", "."))
-        error_log = project_dir / ".claude" / "logs" / "errors.log"
-        error_log.parent.mkdir(parents=True, exist_ok=True)
-        with open(error_log, "a") as f:
-            f.write(f"{datetime.now().isoformat()} - Surveillance security hook error: {str(e)}\n")
-    except:
-        pass  # Fail silently if error logging fails
-    sys.exit(0)
\ No newline at end of file
+        # Start timing for performance metrics
+        start_time = time.time()
+
+        # Load input from stdin
+        with metrics.phase("parse"):
+            input_data = json.loads(raw_input) if raw_input is not None else json.load(sys.stdin)
+        with metrics.phase("match"):
+            output, event = evaluate_event(input_data, start_time)
+
+        # Emit the decision before any logging I/O and close stdout so the
+        # caller sees EOF immediately
+        print(json.dumps(output))
+        sys.stdout.close()
+
+        # Claude Code waits for the hook process to exit: leave the log write
+        # to a detached child and exit as soon as the decision is out
+        agent_pid = os.getppid()
+        if os.fork():
+            os._exit(0)
+        detach_stdio()
+
+        with metrics.phase("log_write"):
+            log_security_event(*event, skip_permissions=proc_tree.skip_permissions(agent_pid))
+        metrics.flush(input_data.get("hook_event_name", ""))
+        sys.exit(0)
+
+    except Exception as e:
+        # Log error but don't block execution
+        log_hook_error(e)
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
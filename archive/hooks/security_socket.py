@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Security Socket
+Where security-daemon.py listens and how both ends decide to trust it.
+
+The socket lives in a per-user directory that must be owned by us with mode
+0700, and the process on the other end must run as our uid. The client
+imports this module before any decision is made, so it only needs os,
+socket, stat, struct and zlib.
+"""
+
+import os
+import socket
+import stat
+import struct
+import zlib
+
+
+def get_socket_path():
+    """
+    Per-project socket path shared by the daemon and its client
+    SECURITY_DAEMON_SOCKET must also point into a private directory.
+    """
+    override = os.environ.get("SECURITY_DAEMON_SOCKET")
+    if override:
+        return override
+    project_dir = os.path.abspath(os.environ.get("CLAUDE_PROJECT_DIR", "."))
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "/tmp")
+    return os.path.join(runtime_dir, f"claude-security-{os.getuid()}",
+                        f"{zlib.crc32(project_dir.encode()):08x}.sock")
+
+def is_private_dir(path):
+    """Whether path is a real directory owned by us that no one else can enter"""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+def peer_credentials(sock):
+    """(pid, uid, gid) of the process on the other end of a Unix socket"""
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", credentials)
+
+def peer_uid(sock):
+    """uid of the process on the other end of a Unix socket"""
+    return peer_credentials(sock)[1]
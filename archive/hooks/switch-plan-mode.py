@@ -17,59 +17,105 @@ Event Trigger: PreToolUse - ExitPlanMode
 Action: Remove auto-approval behavior and switch to interactive plan mode
 """
 
-import json
+from __future__ import annotations
+
 import sys
 import os
-import subprocess
-from typing import Dict, Any, Optional
+import time
+
+# json and proc_tree are imported after the ExitPlanMode fast path
+# Created by start_metrics() once an event turns out to be relevant, so
+# irrelevant events never import hook_metrics
+metrics = None
+STARTED = time.perf_counter()
+
+def start_metrics():
+    """Return this hook's HookMetrics, importing hook_metrics on first use"""
+    global metrics
+    if metrics is None:
+        from hook_metrics import HookMetrics
+        metrics = HookMetrics("switch-plan-mode", STARTED)
+    return metrics
+
+
+def get_cache_path() -> str:
+    """Per-user runtime file holding the last probe result"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or '/tmp'
+    return os.path.join(runtime_dir, f'claude-switch-plan-mode-{os.getuid()}.json')
+
+
+def read_cached_probe(agent: tuple[int, int]) -> bool | None:
+    """Return the cached result for this agent process, or None on a miss."""
+    import json
+
+    try:
+        with open(get_cache_path(), 'r') as f:
+            # Only trust a cache file we own
+            if os.fstat(f.fileno()).st_uid != os.getuid():
+                return None
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if [cached.get('pid'), cached.get('start_time')] != list(agent):
+        return None
+    return bool(cached.get('skip'))
+
+
+def write_cached_probe(agent: tuple[int, int], skip: bool) -> None:
+    import json
+    import tempfile
+
+    path = get_cache_path()
+    # mkstemp picks an unpredictable name and opens it with O_EXCL, so a
+    # symlink planted in the shared temp dir is never followed
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'pid': agent[0], 'start_time': agent[1], 'skip': skip}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
 
 
 def check_dangerous_skip_permissions() -> bool:
     """
     Check if Claude is currently running with --dangerously-skip-permissions flag.
-    This can be detected by checking the current process arguments or environment.
-    """
-    try:
-        # Check current process command line arguments
-        with open('/proc/self/cmdline', 'rb') as f:
-            cmdline = f.read().decode('utf-8', errors='ignore')
-            if '--dangerously-skip-permissions' in cmdline:
-                return True
-    except (FileNotFoundError, PermissionError):
-        # /proc not available or not Linux, try alternative methods
-        pass
-
-    try:
-        # Check parent process arguments (Claude Code process)
-        ppid = os.getppid()
-        with open(f'/proc/{ppid}/cmdline', 'rb') as f:
-            cmdline = f.read().decode('utf-8', errors='ignore')
-            if '--dangerously-skip-permissions' in cmdline:
-                return True
-    except (FileNotFoundError, PermissionError):
-        pass
 
+    The flag is looked for on the command lines of this process and its
+    ancestors (see proc_tree). The answer cannot change for the life of the Claude
+    process, so it is cached keyed by that process's pid and start time (the
+    start time tells a reused pid apart). Without /proc, set
+    CLAUDE_DANGEROUS_SKIP_PERMISSIONS instead.
+    """
     # Check environment variables that might indicate dangerous skip mode
     if os.environ.get('CLAUDE_DANGEROUS_SKIP_PERMISSIONS'):
         return True
 
-    # As a fallback, check if we can find claude process with the flag
-    try:
-        result = subprocess.run(
-            ['pgrep', '-f', '--dangerously-skip-permissions'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return True
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
+    import proc_tree
+
+    agent = proc_tree.agent_process()
+    if agent is None:
+        # /proc not available or not Linux
+        return False
+
+    key = (agent.pid, agent.start_time)
+    cached = read_cached_probe(key)
+    if cached is not None:
+        return cached
 
-    return False
+    skip = proc_tree.skip_permissions()
+    write_cached_probe(key, skip)
+    return skip
 
 
-def validate_input(input_data: Dict[str, Any]) -> bool:
+def validate_input(input_data: dict) -> bool:
     """Validate the hook input data structure."""
     required_fields = ['hook_event_name', 'tool_name']
 
@@ -80,7 +126,7 @@ def validate_input(input_data: Dict[str, Any]) -> bool:
     return True
 
 
-def create_plan_mode_switch_response() -> Dict[str, Any]:
+def create_plan_mode_switch_response() -> dict:
     """
     Create the JSON response to switch from auto-approval to interactive plan mode.
     This asks the user to confirm the ExitPlanMode tool call instead of auto-approving it.
@@ -95,44 +141,63 @@ def create_plan_mode_switch_response() -> Dict[str, Any]:
     }
 
 
-def main():
-    """Main hook execution function."""
-    try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error reading input: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    # Validate input structure
-    if not validate_input(input_data):
-        print("Error: Invalid input structure", file=sys.stderr)
-        sys.exit(1)
-
+def handle(input_data: dict) -> dict | None:
+    """Return the mode switch response for ExitPlanMode, or None to allow normally."""
     # Extract relevant data
     hook_event_name = input_data.get("hook_event_name", "")
     tool_name = input_data.get("tool_name", "")
-    tool_input = input_data.get("tool_input", {})
 
     # Only proceed if this is a PreToolUse event for ExitPlanMode
     if hook_event_name != "PreToolUse" or tool_name != "ExitPlanMode":
         # Not our target event, allow normal processing
-        sys.exit(0)
+        return None
 
     # Check if dangerous skip permissions mode is active
-    if not check_dangerous_skip_permissions():
+    with start_metrics().phase("probe"):
+        dangerous_skip = check_dangerous_skip_permissions()
+    if not dangerous_skip:
         # Not in dangerous skip mode, allow normal processing
-        sys.exit(0)
+        return None
 
     # We are in dangerous skip mode and ExitPlanMode is being called
     # Switch to interactive plan mode
-    response = create_plan_mode_switch_response()
+    return create_plan_mode_switch_response()
+
+
+def main():
+    """Main hook execution function."""
+    try:
+        # Read JSON input from stdin
+        raw_input = sys.stdin.buffer.read()
+    except Exception as e:
+        print(f"Error reading input: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Fast path: only ExitPlanMode calls need parsing (or any further imports)
+    if b'"ExitPlanMode"' not in raw_input:
+        sys.exit(0)
+
+    import json
+    try:
+        parse_start = time.perf_counter()
+        input_data = json.loads(raw_input)
+        parse_time = time.perf_counter() - parse_start
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Validate input structure
+    if not validate_input(input_data):
+        print("Error: Invalid input structure", file=sys.stderr)
+        sys.exit(1)
 
-    # Output the JSON response to switch modes
-    print(json.dumps(response, indent=2))
+    response = handle(input_data)
+    if response is not None:
+        # Output the JSON response to switch modes
+        print(json.dumps(response, indent=2))
+    if metrics is not None:
+        metrics.add("parse", parse_time)
+        metrics.flush(input_data.get("hook_event_name", ""))
 
     # Exit successfully to apply the mode switch
     sys.exit(0)
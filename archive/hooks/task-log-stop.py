@@ -11,123 +11,11 @@ import json
 import sys
 import os
 import datetime
-import re
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 
-def extract_agent_name(transcript_path: str) -> str:
-    """Extract agent name from transcript or session context."""
-    try:
-        if os.path.exists(transcript_path):
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                # Read the last few lines to find agent context
-                lines = f.readlines()
-                for line in reversed(lines[-50:]):  # Check last 50 lines
-                    try:
-                        data = json.loads(line.strip())
-                        if 'role' in data and data['role'] == 'assistant':
-                            # Look for agent mentions in content
-                            content = data.get('content', '')
-                            # Check for subagent patterns
-                            if 'subagent' in content.lower() or '@' in content:
-                                agent_patterns = [
-                                    r'@([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
-                                    r'subagent:\s*([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
-                                    r'agent:\s*([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
-                                    r'using\s+([a-zA-Z-]+(?:-[a-zA-Z]+)*)\s+agent'
-                                ]
-                                for pattern in agent_patterns:
-                                    match = re.search(pattern, content, re.IGNORECASE)
-                                    if match:
-                                        return match.group(1).lower()
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-    except Exception:
-        pass
-
-    return "main-agent"
-
-def extract_user_prompt(transcript_path: str) -> str:
-    """Extract the most recent user prompt from transcript."""
-    try:
-        if os.path.exists(transcript_path):
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # Look for the most recent user message
-                for line in reversed(lines):
-                    try:
-                        data = json.loads(line.strip())
-                        if 'role' in data and data['role'] == 'user':
-                            content = data.get('content', '')
-                            if content:
-                                # Clean up and truncate
-                                content = content.strip()
-                                # Remove system-reminder tags if present
-                                if '<system-reminder>' in content:
-                                    # Extract just the user's actual prompt
-                                    parts = content.split('<system-reminder>')
-                                    content = parts[0].strip()
-
-                                # Truncate to reasonable length
-                                if len(content) > 150:
-                                    content = content[:147] + "..."
-
-                                return content if content else "No prompt found"
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-    except Exception:
-        pass
-
-    return "No prompt found"
-
-def find_last_todo_list(transcript_path: str) -> Tuple[List[str], bool]:
-    """
-    Find the most recent TodoWrite tool call and extract tasks.
-    Returns (tasks, has_incomplete) tuple.
-    """
-    try:
-        if os.path.exists(transcript_path):
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-                # Look for the most recent tool use with TodoWrite
-                for line in reversed(lines):
-                    try:
-                        data = json.loads(line.strip())
-
-                        # Check if this is a tool use message
-                        if 'role' in data and data['role'] == 'assistant':
-                            content = data.get('content', [])
-
-                            # Content might be a list of content blocks
-                            if isinstance(content, list):
-                                for block in content:
-                                    if isinstance(block, dict) and block.get('type') == 'tool_use':
-                                        if block.get('name') == 'TodoWrite':
-                                            tool_input = block.get('input', {})
-                                            todos = tool_input.get('todos', [])
-
-                                            if todos:
-                                                tasks = []
-                                                has_incomplete = False
+from hook_metrics import HookMetrics
 
-                                                for todo in todos:
-                                                    if isinstance(todo, dict):
-                                                        task = todo.get('content', todo.get('description', 'Unknown task'))
-                                                        status = todo.get('status', 'pending').lower()
-
-                                                        tasks.append(task)
-
-                                                        if status != 'completed':
-                                                            has_incomplete = True
-
-                                                return tasks, has_incomplete
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-    except Exception:
-        pass
-
-    return [], False
+metrics = HookMetrics("task-log-stop")
 
 def format_tasks(tasks: List[str]) -> str:
     """Format all tasks as vertical list."""
@@ -194,15 +82,8 @@ def append_log_entry(log_path: str, entry: str) -> None:
     except Exception as e:
         print(f"Error writing to log: {e}", file=sys.stderr)
 
-def main():
-    """Main hook execution function."""
-    try:
-        # Read input from stdin
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
-        sys.exit(1)
-
+def handle(input_data: Dict) -> Optional[Dict]:
+    """Process one hook event and return the JSON output to print, if any."""
     # Extract relevant data
     hook_event = input_data.get("hook_event_name", "")
     cwd = input_data.get("cwd", "")
@@ -211,22 +92,25 @@ def main():
 
     # Only process Stop events
     if hook_event != "Stop":
-        sys.exit(0)
+        return None
 
     # Avoid infinite loops - don't process if stop hook already active
     if stop_hook_active:
-        sys.exit(0)
+        return None
 
-    # Check if there are incomplete tasks
-    tasks, has_incomplete = find_last_todo_list(transcript_path)
+    # Read tasks, agent name and user prompt in a single transcript pass
+    # Imported only once the event is known to be relevant
+    from transcript_reader import read_transcript_context
+    with metrics.phase("transcript"):
+        transcript = read_transcript_context(transcript_path)
+    tasks = transcript.todos
 
     # Only log if there are incomplete tasks
-    if not has_incomplete or not tasks:
-        sys.exit(0)
+    if not transcript.has_incomplete or not tasks:
+        return None
 
-    # Extract agent name and user prompt
-    agent_name = extract_agent_name(transcript_path)
-    user_prompt = extract_user_prompt(transcript_path)
+    agent_name = transcript.agent_name
+    user_prompt = transcript.user_prompt
 
     # Format the data
     timestamp = datetime.datetime.now().strftime("%H:%M:%S")
@@ -236,10 +120,26 @@ def main():
 
     # Write to log file
     log_path = os.path.join(cwd, ".claude", "logs", "TASKS.log")
-    append_log_entry(log_path, log_entry)
+    with metrics.phase("log_write"):
+        append_log_entry(log_path, log_entry)
 
     # Success - suppress output
-    print(json.dumps({"suppressOutput": True}))
+    return {"suppressOutput": True}
+
+def main():
+    """Main hook execution function."""
+    try:
+        # Read input from stdin
+        with metrics.phase("parse"):
+            input_data = json.load(sys.stdin)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    output = handle(input_data)
+    if output is not None:
+        print(json.dumps(output))
+    metrics.flush(input_data.get("hook_event_name", ""))
     sys.exit(0)
 
 if __name__ == "__main__":
@@ -7,80 +7,29 @@ This hook monitors TodoList tool operations and logs them in a structured format
 for tracking task management activities across sessions.
 """
 
+from __future__ import annotations
+
 import json
 import sys
 import os
-import datetime
-import re
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+import time
 
-def extract_agent_name(transcript_path: str) -> str:
-    """Extract agent name from transcript or session context."""
-    try:
-        if os.path.exists(transcript_path):
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                # Read the last few lines to find agent context
-                lines = f.readlines()
-                for line in reversed(lines[-50:]):  # Check last 50 lines
-                    try:
-                        data = json.loads(line.strip())
-                        if 'role' in data and data['role'] == 'assistant':
-                            # Look for agent mentions in content
-                            content = data.get('content', '')
-                            # Check for subagent patterns
-                            if 'subagent' in content.lower() or '@' in content:
-                                agent_patterns = [
-                                    r'@([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
-                                    r'subagent:\s*([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
-                                    r'agent:\s*([a-zA-Z-]+(?:-[a-zA-Z]+)*)',
-                                    r'using\s+([a-zA-Z-]+(?:-[a-zA-Z]+)*)\s+agent'
-                                ]
-                                for pattern in agent_patterns:
-                                    match = re.search(pattern, content, re.IGNORECASE)
-                                    if match:
-                                        return match.group(1).lower()
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-    except Exception:
-        pass
-
-    return "main-agent"
-
-def extract_user_prompt(transcript_path: str) -> str:
-    """Extract the most recent user prompt from transcript."""
-    try:
-        if os.path.exists(transcript_path):
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # Look for the most recent user message
-                for line in reversed(lines):
-                    try:
-                        data = json.loads(line.strip())
-                        if 'role' in data and data['role'] == 'user':
-                            content = data.get('content', '')
-                            if content:
-                                # Clean up and truncate
-                                content = content.strip()
-                                # Remove system-reminder tags if present
-                                if '<system-reminder>' in content:
-                                    # Extract just the user's actual prompt
-                                    parts = content.split('<system-reminder>')
-                                    content = parts[0].strip()
-
-                                # Truncate to reasonable length
-                                if len(content) > 150:
-                                    content = content[:147] + "..."
-
-                                return content if content else "No prompt found"
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-    except Exception:
-        pass
-
-    return "No prompt found"
-
-def parse_todo_items(items: List[Dict]) -> Tuple[List[str], Dict[str, int]]:
+# datetime is imported once an event is known to be relevant
+
+# Created by start_metrics() once an event turns out to be relevant, so
+# irrelevant events never import hook_metrics
+metrics = None
+STARTED = time.perf_counter()
+
+def start_metrics():
+    """Return this hook's HookMetrics, importing hook_metrics on first use"""
+    global metrics
+    if metrics is None:
+        from hook_metrics import HookMetrics
+        metrics = HookMetrics("task-log", STARTED)
+    return metrics
+
+def parse_todo_items(items: list[dict]) -> tuple[list[str], dict[str, int]]:
     """Parse todo items and return all tasks with status counts."""
     all_tasks = []
     status_counts = {
@@ -106,7 +55,7 @@ def parse_todo_items(items: List[Dict]) -> Tuple[List[str], Dict[str, int]]:
 
     return all_tasks, status_counts
 
-def format_status(status_counts: Dict[str, int]) -> str:
+def format_status(status_counts: dict[str, int]) -> str:
     """Determine overall status from task counts."""
     total = sum(status_counts.values())
 
@@ -120,7 +69,7 @@ def format_status(status_counts: Dict[str, int]) -> str:
     # Any incomplete tasks = Cancelled (session interrupted/abandoned)
     return "Cancelled"
 
-def format_tasks(tasks: List[str]) -> str:
+def format_tasks(tasks: list[str]) -> str:
     """Format all tasks as vertical list."""
     if not tasks:
         return "  None"
@@ -132,7 +81,7 @@ def format_tasks(tasks: List[str]) -> str:
 
     return "\n".join(formatted)
 
-def format_log_entry(timestamp: str, agent_name: str, user_prompt: str, status: str, tasks: List[str]) -> str:
+def format_log_entry(timestamp: str, agent_name: str, user_prompt: str, status: str, tasks: list[str]) -> str:
     """Format log entry in vertical structure."""
     entry_parts = [
         timestamp,
@@ -159,6 +108,8 @@ def ensure_log_file(log_path: str) -> None:
 
 def append_log_entry(log_path: str, entry: str) -> None:
     """Append an entry to the log file."""
+    import datetime
+
     try:
         ensure_log_file(log_path)
 
@@ -185,15 +136,8 @@ def append_log_entry(log_path: str, entry: str) -> None:
     except Exception as e:
         print(f"Error writing to log: {e}", file=sys.stderr)
 
-def main():
-    """Main hook execution function."""
-    try:
-        # Read input from stdin
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
-        sys.exit(1)
-
+def handle(input_data: dict) -> dict | None:
+    """Process one hook event and return the JSON output to print, if any."""
     # Extract relevant data
     hook_event = input_data.get("hook_event_name", "")
     tool_name = input_data.get("tool_name", "")
@@ -204,19 +148,24 @@ def main():
 
     # Only process PostToolUse events for TodoList/TodoWrite tools
     if hook_event != "PostToolUse":
-        sys.exit(0)
+        return None
 
     # Check if it's a TodoList-related tool
     if tool_name not in ["TodoWrite", "TodoList", "TodoUpdate", "TodoDelete"]:
         # Also check if tool_name contains "todo" (case insensitive)
         if "todo" not in tool_name.lower():
-            sys.exit(0)
+            return None
 
-    # Extract agent name
-    agent_name = extract_agent_name(transcript_path)
+    start_metrics()
+    import datetime
 
-    # Extract user prompt as context
-    context = extract_user_prompt(transcript_path)
+    # Extract agent name and user prompt in a single transcript pass
+    # Imported only once the event is known to be relevant
+    from transcript_reader import read_transcript_context
+    with metrics.phase("transcript"):
+        transcript = read_transcript_context(transcript_path)
+    agent_name = transcript.agent_name
+    context = transcript.user_prompt
 
     # Parse todo items from input or output
     items = []
@@ -242,10 +191,29 @@ def main():
 
     # Write to log file
     log_path = os.path.join(cwd, ".claude", "logs", "TASKS.log")
-    append_log_entry(log_path, log_entry)
+    with metrics.phase("log_write"):
+        append_log_entry(log_path, log_entry)
 
     # Success - no output needed (suppress output to not interfere with tool)
-    print(json.dumps({"suppressOutput": True}))
+    return {"suppressOutput": True}
+
+def main():
+    """Main hook execution function."""
+    try:
+        # Read input from stdin
+        parse_start = time.perf_counter()
+        input_data = json.load(sys.stdin)
+        parse_time = time.perf_counter() - parse_start
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    output = handle(input_data)
+    if output is not None:
+        print(json.dumps(output))
+    if metrics is not None:
+        metrics.add("parse", parse_time)
+        metrics.flush(input_data.get("hook_event_name", ""))
     sys.exit(0)
 
 if __name__ == "__main__":
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Hook Benchmark
+
+Replays synthetic hook events against the scripts in archive/hooks and
+reports per-hook latency and resource usage, so scaling regressions (full
+log rewrites, whole-transcript scans) show up before they reach users.
+
+A throwaway project is generated first: a JSONL transcript of
+--transcript-size, CHANGELOG.md, SECURITY.log and TASKS.log of --log-size
+each, and --log-size worth of other sessions' activity shards. Every hook is then run end-to-end
+as Claude Code would run it (fresh interpreter, event JSON on stdin) and
+measured for:
+
+    wall time        p50 / p95 / p99 over --runs
+    peak RSS         ru_maxrss of the hook process
+    bytes read       rchar from /proc/<pid>/io (includes stdin and .pyc files)
+    bytes written    wchar from /proc/<pid>/io
+
+Runs accumulate state the way a real session does (journals grow and are
+rendered on Stop). Notifications never leave the machine: NTFY_SERVER points
+at an in-process ntfy-stub-server, and the security client is pointed at a
+socket that does not exist so it measures its in-process fallback.
+
+Usage:
+    python3 archive/hooks/tools/bench-hooks.py
+    python3 archive/hooks/tools/bench-hooks.py --transcript-size 50MB --log-size 5MB --runs 20
+    python3 archive/hooks/tools/bench-hooks.py --only change-log --cold --json
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+SESSION_ID = "bench-session"
+
+LOREM = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua. ")
+
+
+def parse_size(text):
+    """Parse sizes like 1KB, 50MB or 1048576 into bytes"""
+    text = text.strip().upper()
+    number = text.rstrip("KMGB")
+    unit = text[len(number):]
+    if unit not in SIZE_UNITS or not number:
+        raise argparse.ArgumentTypeError(f"invalid size: {text}")
+    return int(float(number) * SIZE_UNITS[unit])
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic project
+# ---------------------------------------------------------------------------
+
+def transcript_records(rng):
+    """Endless stream of transcript records shaped like Claude Code's"""
+    turn = 0
+    while True:
+        turn += 1
+        yield {"role": "user", "content": f"Prompt {turn}: refactor module_{turn % 97}.py and update the tests"}
+        for _ in range(rng.randint(2, 6)):
+            yield {"role": "assistant", "content": LOREM * rng.randint(1, 12)}
+        if turn % 7 == 0:
+            yield {"role": "assistant", "content": f"Delegating to @code-reviewer agent for turn {turn}"}
+        if turn % 3 == 0:
+            yield {"role": "assistant", "content": [{
+                "type": "tool_use",
+                "name": "TodoWrite",
+                "input": {"todos": [
+                    {"content": f"Task {turn}.{i}", "status": "completed" if i < 2 else "pending"}
+                    for i in range(4)
+                ]}
+            }]}
+
+def write_transcript(path, size, rng):
+    """Write a JSONL transcript of roughly size bytes"""
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in transcript_records(rng):
+            if written >= size:
+                break
+            line = json.dumps(record) + "\n"
+            f.write(line)
+            written += len(line)
+
+def write_dated_log(path, header, size, make_entry):
+    """Write a markdown log with newest-first date sections up to size bytes"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header)
+        written = len(header)
+        day = 0
+        while written < size:
+            section = f"\n### 2025-{1 + day // 28 % 12:02d}-{1 + day % 28:02d}\n\n"
+            f.write(section)
+            written += len(section)
+            for i in range(200):
+                entry = make_entry(day, i)
+                f.write(entry)
+                written += len(entry)
+                if written >= size:
+                    break
+            day += 1
+
+def write_session_activity(sessions_dir, size):
+    """Write activity shards for enough other sessions to reach size bytes"""
+    os.makedirs(sessions_dir)
+    written = 0
+    index = 0
+    while written < size:
+        session = {
+            "files_edited": [f"file_{index}_{i}.py" for i in range(5)],
+            "files_created": [f"new_{index}.py"],
+            "commands_run": index % 40,
+            "agents_launched": ["code-reviewer"],
+            "last_prompt": f"Prompt for session {index}",
+            "all_prompts": [f"Prompt {i} for session {index}" for i in range(5)],
+            "last_activity": "2025-01-01T00:00:00"
+        }
+        data = json.dumps(session)
+        with open(os.path.join(sessions_dir, f"session-{index}.json"), "w") as f:
+            f.write(data)
+        written += len(data)
+        index += 1
+
+def build_project(root, transcript_size, log_size, seed):
+    """Create the synthetic project tree; returns the transcript path"""
+    rng = random.Random(seed)
+    claude_dir = os.path.join(root, ".claude")
+    logs_dir = os.path.join(claude_dir, "logs")
+    os.makedirs(logs_dir)
+    os.makedirs(os.path.join(claude_dir, "hooks"))
+    os.makedirs(os.path.join(root, "src"))
+
+    transcript_path = os.path.join(root, "transcript.jsonl")
+    write_transcript(transcript_path, transcript_size, rng)
+
+    write_dated_log(
+        os.path.join(logs_dir, "CHANGELOG.md"),
+        "# Changelog\n\n## Format\n\n```\nTIME | TYPE | DESCRIPTION | FILE_PATH | AGENT\n```\n\n---\n",
+        log_size,
+        lambda day, i: f"- 12:{i % 60:02d}:00 | Changed | Updated Python script | `src/module_{day}_{i}.py` | main-agent\n"
+    )
+    write_dated_log(
+        os.path.join(logs_dir, "SECURITY.log"),
+        "# Security Log\n\n---\n",
+        log_size,
+        lambda day, i: f"- 12:{i % 60:02d}:00 | Access | ALLOWED - LOW RISK | ls -la src/{i} | Bash | s{day} | 0 | none | 1.2ms | 0\n"
+    )
+    write_dated_log(
+        os.path.join(logs_dir, "TASKS.log"),
+        "# Task Log\n" + "#" + "=" * 70 + "\n",
+        log_size,
+        lambda day, i: f"12:{i % 60:02d}:00\n\nPrompt: prompt {i}\nTasks:\n  - Task {i}\nOwned by: main-agent\nStatus: 1/1 completed\n\n---\n"
+    )
+    write_session_activity(os.path.join(claude_dir, "hooks", "sessions"), log_size)
+
+    return transcript_path
+
+
+# ---------------------------------------------------------------------------
+# Events
+# ---------------------------------------------------------------------------
+
+def build_events(project_dir, transcript_path, write_size):
+    """Representative stdin payloads keyed by scenario name"""
+    base = {"session_id": SESSION_ID, "transcript_path": transcript_path, "cwd": project_dir}
+    content = (LOREM * (write_size // len(LOREM) + 1))[:write_size]
+
+    return {
+        "PreToolUse:Bash": dict(base, hook_event_name="PreToolUse", tool_name="Bash",
+                                tool_input={"command": "git status && ls -la src", "description": "Check status"}),
+        "PreToolUse:Write": dict(base, hook_event_name="PreToolUse", tool_name="Write",
+                                 tool_input={"file_path": os.path.join(project_dir, "src", "app.py"), "content": content}),
+        "PreToolUse:ExitPlanMode": dict(base, hook_event_name="PreToolUse", tool_name="ExitPlanMode",
+                                        tool_input={"plan": "Refactor the module"}),
+        "PostToolUse:Write": dict(base, hook_event_name="PostToolUse", tool_name="Write",
+                                  tool_input={"file_path": os.path.join(project_dir, "src", "app.py"), "content": content},
+                                  tool_response={"success": True}),
+        "PostToolUse:Edit": dict(base, hook_event_name="PostToolUse", tool_name="Edit",
+                                 tool_input={"file_path": os.path.join(project_dir, "src", "util.py"),
+                                             "old_string": "a", "new_string": "b"},
+                                 tool_response={"success": True}),
+        "PostToolUse:TodoWrite": dict(base, hook_event_name="PostToolUse", tool_name="TodoWrite",
+                                      tool_input={"todos": [{"content": f"Task {i}", "status": "pending"} for i in range(8)]}),
+        "Stop": dict(base, hook_event_name="Stop", stop_hook_active=False),
+        "SubagentStop": dict(base, hook_event_name="SubagentStop", stop_hook_active=False),
+        "UserPromptSubmit": dict(base, hook_event_name="UserPromptSubmit",
+                                 prompt="Please refactor the parser and add tests"),
+    }
+
+# (scenario, hook script, extra arguments)
+CASES = [
+    ("PreToolUse:Bash", "security.py", []),
+    ("PreToolUse:Bash", "security-client.py", []),
+    ("PreToolUse:Write", "security.py", []),
+    ("PreToolUse:ExitPlanMode", "switch-plan-mode.py", []),
+    ("PostToolUse:Write", "change-log.py", []),
+    ("PostToolUse:Write", "notify-ntfy.py", []),
+    ("PostToolUse:Write", "hook-dispatcher.py", []),
+    ("PostToolUse:Edit", "change-log.py", []),
+    ("PostToolUse:TodoWrite", "task-log.py", []),
+    ("PostToolUse:TodoWrite", "hook-dispatcher.py", []),
+    ("UserPromptSubmit", "notify-ntfy.py", []),
+    ("UserPromptSubmit", "hook-dispatcher.py", []),
+    ("SubagentStop", "change-log.py", []),
+    ("SubagentStop", "notify-ntfy.py", []),
+    ("Stop", "task-log-stop.py", []),
+    ("Stop", "change-log.py", []),
+    ("Stop", "security.py", ["--render"]),
+    ("Stop", "notify-ntfy.py", []),
+    ("Stop", "hook-dispatcher.py", []),
+]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def start_ntfy_stub():
+    """Serve tools/ntfy-stub-server.py from a background thread"""
+    spec = importlib.util.spec_from_file_location(
+        "ntfy_stub_server", os.path.join(HOOKS_DIR, "tools", "ntfy-stub-server.py"))
+    stub = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(stub)
+
+    server = stub.make_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def read_proc_io(pid):
+    """Return (rchar, wchar) for a process that has exited but not been reaped"""
+    counters = {}
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                counters[key] = int(value)
+    except OSError:
+        return None, None
+    return counters.get("rchar"), counters.get("wchar")
+
+def run_hook(args, payload, env, cwd):
+    """Run one hook invocation; returns a sample dict"""
+    stdin_bytes = json.dumps(payload).encode("utf-8")
+
+    with tempfile.TemporaryFile() as stderr_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable] + args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr_file,
+            env=env,
+            cwd=cwd
+        )
+        try:
+            process.stdin.write(stdin_bytes)
+            process.stdin.close()
+        except BrokenPipeError:
+            # Fast-path hooks may exit before reading all of stdin
+            pass
+
+        # Wait without reaping so /proc/<pid>/io is still readable
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        elapsed = time.perf_counter() - start
+        bytes_read, bytes_written = read_proc_io(process.pid)
+
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", errors="replace").strip()
+
+    return {
+        "wall_ms": elapsed * 1000,
+        "max_rss_kb": usage.ru_maxrss,
+        "bytes_read": bytes_read,
+        "bytes_written": bytes_written,
+        "returncode": process.returncode,
+        "stderr": stderr
+    }
+
+def summarize(samples):
+    """Aggregate the samples of one case"""
+    wall = [s["wall_ms"] for s in samples]
+    reads = [s["bytes_read"] for s in samples if s["bytes_read"] is not None]
+    writes = [s["bytes_written"] for s in samples if s["bytes_written"] is not None]
+    return {
+        "runs": len(samples),
+        "p50_ms": round(percentile(wall, 0.50), 2),
+        "p95_ms": round(percentile(wall, 0.95), 2),
+        "p99_ms": round(percentile(wall, 0.99), 2),
+        "peak_rss_kb": max(s["max_rss_kb"] for s in samples),
+        "bytes_read_p50": percentile(reads, 0.50) if reads else None,
+        "bytes_written_p50": percentile(writes, 0.50) if writes else None,
+        "failures": sum(1 for s in samples if s["returncode"] != 0),
+        "last_error": next((s["stderr"] for s in reversed(samples) if s["stderr"]), "")
+    }
+
+def format_bytes(value):
+    if value is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GB"
+
+def print_table(results, settings):
+    print(f"transcript {format_bytes(settings['transcript_size'])}, logs {format_bytes(settings['log_size'])}, "
+          f"{settings['runs']} runs{', cold index' if settings['cold'] else ''}\n")
+    print(f"{'scenario':<24} {'hook':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'peak RSS':>9} {'read':>8} {'written':>8}")
+    for result in results:
+        print(f"{result['scenario']:<24} {result['hook']:<22} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {format_bytes(result['peak_rss_kb'] * 1024):>9} "
+              f"{format_bytes(result['bytes_read_p50']):>8} {format_bytes(result['bytes_written_p50']):>8}")
+        if result["failures"]:
+            print(f"    {result['failures']} failed run(s): {result['last_error'][:200]}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hook scripts against synthetic events")
+    parser.add_argument("--runs", type=int, default=10, help="invocations per hook and scenario")
+    parser.add_argument("--transcript-size", type=parse_size, default=parse_size("1MB"),
+                        help="synthetic transcript size, e.g. 1KB, 50MB, 500MB")
+    parser.add_argument("--log-size", type=parse_size, default=parse_size("256KB"),
+                        help="size of each pre-existing log file")
+    parser.add_argument("--write-size", type=parse_size, default=parse_size("4KB"),
+                        help="content size of Write tool payloads")
+    parser.add_argument("--only", help="only run cases whose hook or scenario contains this text")
+    parser.add_argument("--cold", action="store_true", help="drop the transcript index before every run")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic project directory")
+    args = parser.parse_args()
+
+    project_dir = tempfile.mkdtemp(prefix="hook-bench-")
+    try:
+        transcript_path = build_project(project_dir, args.transcript_size, args.log_size, args.seed)
+        events = build_events(project_dir, transcript_path, args.write_size)
+
+        # Local ntfy stand-in so notifications never reach the network
+        ntfy_server = start_ntfy_stub()
+
+        env = dict(os.environ)
+        env["NTFY_SERVER"] = f"http://127.0.0.1:{ntfy_server.server_address[1]}"
+        # Don't leave senders lingering after the benchmark
+        env["NTFY_SENDER_LINGER"] = "1"
+        env["CLAUDE_PROJECT_DIR"] = project_dir
+        env["SECURITY_DAEMON_SOCKET"] = os.path.join(project_dir, "no-daemon.sock")
+
+        results = []
+        for scenario, script, extra_args in CASES:
+            if args.only and args.only not in script and args.only not in scenario:
+                continue
+
+            samples = []
+            for _ in range(args.runs):
+                if args.cold:
+                    shutil.rmtree(os.path.join(project_dir, ".claude", "cache", "transcript-index"),
+                                  ignore_errors=True)
+                samples.append(run_hook([os.path.join(HOOKS_DIR, script)] + extra_args,
+                                        events[scenario], env, project_dir))
+
+            results.append(dict(summarize(samples), scenario=scenario, hook=script))
+
+        settings = {
+            "transcript_size": args.transcript_size,
+            "log_size": args.log_size,
+            "runs": args.runs,
+            "cold": args.cold
+        }
+        if args.json:
+            print(json.dumps({"settings": settings, "results": results}, indent=2))
+        else:
+            print_table(results, settings)
+            if args.keep:
+                print(f"\nproject kept at {project_dir}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(project_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Startup Budget Check
+
+Runs every hook once per representative event under `python3 -X importtime`
+and fails when the modules a hook imports on that path take longer than its
+budget. Imports the bare interpreter already pays for (site, encodings, ...)
+are measured once and subtracted, so only what the hook itself pulls in is
+counted, including modules imported lazily inside functions.
+
+Budgets are multiples of the cost of `import json` measured on the same
+machine, so the check means the same thing on a fast laptop and a slow CI box.
+
+Run it after touching hook imports:
+    python3 archive/hooks/tools/check-startup-budget.py
+    python3 archive/hooks/tools/check-startup-budget.py --scale 2   # slow machine
+
+Exits 1 if any hook is over budget.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (hook script, label, event payload, import budget in units of `import json`)
+# Irrelevant events must take the fast path and import next to nothing; the
+# reminder hooks' relevant paths also import hook_metrics after printing.
+CASES = [
+    ("remind-subagent.py", "irrelevant", {"hook_event_name": "PreToolUse", "tool_name": "Read"}, 0.1),
+    ("remind-subagent.py", "Task", {"hook_event_name": "PreToolUse", "tool_name": "Task"}, 2.5),
+    ("remind-main-agent.py", "irrelevant", {"hook_event_name": "PreToolUse", "tool_name": "Read"}, 0.1),
+    ("remind-main-agent.py", "Write", {"hook_event_name": "PreToolUse", "tool_name": "Write"}, 2.5),
+    ("compact-instructions.py", "irrelevant", {"hook_event_name": "Stop"}, 0.1),
+    ("compact-instructions.py", "PreCompact", {"hook_event_name": "PreCompact", "trigger": "auto"}, 2.5),
+    ("switch-plan-mode.py", "irrelevant", {"hook_event_name": "PreToolUse", "tool_name": "Bash"}, 2),
+    ("task-log.py", "irrelevant", {"hook_event_name": "PostToolUse", "tool_name": "Read"}, 3),
+    ("task-log.py", "TodoWrite", {"hook_event_name": "PostToolUse", "tool_name": "TodoWrite",
+                                  "tool_input": {"todos": [{"content": "task", "status": "pending"}]}}, 4),
+    ("change-log.py", "irrelevant", {"hook_event_name": "PostToolUse", "tool_name": "Read"}, 3),
+    ("notify-ntfy.py", "PostToolUse", {"hook_event_name": "PostToolUse", "tool_name": "Read",
+                                       "session_id": "budget"}, 2.5),
+    ("security.py", "Bash", {"hook_event_name": "PreToolUse", "tool_name": "Bash",
+                             "tool_input": {"command": "ls"}, "session_id": "budget"}, 3.5),
+    ("security-client.py", "Bash", {"hook_event_name": "PreToolUse", "tool_name": "Bash",
+                                    "tool_input": {"command": "ls"}, "session_id": "budget"}, 4.5),
+    ("hook-dispatcher.py", "PostToolUse", {"hook_event_name": "PostToolUse", "tool_name": "Read",
+                                           "session_id": "budget"}, 3),
+]
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative microseconds} for top-level imports"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        # Nested imports are indented; their cost is already in the parent's total
+        if name.startswith("  "):
+            continue
+        modules[name.strip()] = int(parts[1])
+    return modules
+
+def measure(args, payload, env, cwd):
+    """Import cost in microseconds of one run, per top-level module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        input=json.dumps(payload).encode("utf-8"),
+        capture_output=True,
+        env=env,
+        cwd=cwd,
+        timeout=30
+    )
+    return parse_importtime(result.stderr.decode("utf-8", errors="replace"))
+
+def hook_import_cost(args, payload, env, cwd, baseline, runs):
+    """Fastest of several runs, in microseconds, excluding baseline modules"""
+    best = None
+    for _ in range(runs):
+        modules = measure(args, payload, env, cwd)
+        total = sum(us for name, us in modules.items() if name not in baseline)
+        best = total if best is None else min(best, total)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Check per-hook import time budgets")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow machines)")
+    parser.add_argument("--runs", type=int, default=5, help="runs per case; the fastest one counts")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        env = dict(os.environ)
+        env["CLAUDE_PROJECT_DIR"] = project_dir
+        # Keep the security client on its fallback path; never reach a real daemon
+        env["SECURITY_DAEMON_SOCKET"] = os.path.join(project_dir, "no-daemon.sock")
+
+        baseline = measure(["-c", "pass"], {}, env, project_dir)
+        unit = hook_import_cost(["-c", "import json"], {}, env, project_dir, baseline, args.runs)
+        print(f"import json: {unit / 1000:.2f} ms (budget unit)\n")
+
+        failures = 0
+        for script, label, payload, budget in CASES:
+            payload = dict(payload, cwd=project_dir)
+            script_path = os.path.join(HOOKS_DIR, script)
+            cost = hook_import_cost([script_path], payload, env, project_dir, baseline, args.runs)
+
+            limit = budget * args.scale * unit
+            ok = cost <= limit
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {script:<24} {label:<12} {cost / 1000:7.2f} ms  "
+                  f"(budget {limit / 1000:.2f} ms)")
+
+    if failures:
+        print(f"\n{failures} hook(s) over their startup budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+ntfy Stub Server
+
+A local stand-in for an ntfy server, for exercising notify-ntfy.py and
+ntfy-sender.py without sending real pushes. It accepts publishes on any
+topic, answers with ntfy-shaped JSON and prints each message it receives.
+
+Usage:
+    python3 archive/hooks/tools/ntfy-stub-server.py --port 8080
+    NTFY_SERVER=http://127.0.0.1:8080 python3 archive/hooks/notify-ntfy.py < event.json
+
+--fail N answers the first N requests with 503 to exercise retries.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real server
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode("utf-8", errors="replace")
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            failing = server.requests <= server.fail_first
+            if not failing:
+                server.messages.append({
+                    "topic": parts.path.rsplit("/", 1)[-1],
+                    "title": query.get("title", [self.headers.get("Title", "")])[0],
+                    "priority": query.get("priority", [self.headers.get("Priority", "default")])[0],
+                    "message": body,
+                    "connection": self.client_address[1]
+                })
+
+        if failing:
+            self.send_reply(503, {"code": 50301, "http": 503, "error": "stub failure"})
+            return
+
+        if server.verbose:
+            print(f"[{self.client_address[1]}] {server.messages[-1]['title']}: {body}", flush=True)
+        self.send_reply(200, {
+            "id": f"stub{server.requests}",
+            "time": int(time.time()),
+            "event": "message",
+            "topic": server.messages[-1]["topic"],
+            "message": body
+        })
+
+    def send_reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=0, fail_first=0, verbose=False):
+    """Create a stub server on 127.0.0.1; received messages collect in server.messages"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.messages = []
+    server.requests = 0
+    server.fail_first = fail_first
+    server.verbose = verbose
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in ntfy server")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fail", type=int, default=0, help="answer the first N requests with 503")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.fail, verbose=True)
+    print(f"ntfy stub listening on http://127.0.0.1:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for hook-dispatcher.py's routing table and output merging.
+
+Run from anywhere:
+    python3 -m unittest discover -s archive/hooks/tools -p 'test_*.py'
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_dispatcher():
+    """Import hook-dispatcher.py (its file name contains a hyphen)"""
+    if HOOKS_DIR not in sys.path:
+        sys.path.insert(0, HOOKS_DIR)
+    spec = importlib.util.spec_from_file_location(
+        "hook_dispatcher", os.path.join(HOOKS_DIR, "hook-dispatcher.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+dispatcher = load_dispatcher()
+
+
+class MergeOutputsTest(unittest.TestCase):
+
+    def test_output_is_suppressed_only_if_every_handler_suppresses(self):
+        self.assertTrue(dispatcher.merge_outputs(
+            [{"suppressOutput": True}, {"suppressOutput": True}])["suppressOutput"])
+        self.assertFalse(dispatcher.merge_outputs(
+            [{"suppressOutput": True}, {"suppressOutput": False}])["suppressOutput"])
+
+    def test_other_keys_take_the_last_value(self):
+        merged = dispatcher.merge_outputs([{"systemMessage": "first"}, {"systemMessage": "second"}])
+        self.assertEqual(merged, {"systemMessage": "second"})
+
+    def test_no_outputs(self):
+        self.assertEqual(dispatcher.merge_outputs([]), {})
+
+
+class MatchingHandlersTest(unittest.TestCase):
+
+    def test_pre_tool_use_is_not_dispatched(self):
+        for tool_name in ("Bash", "Write", "ExitPlanMode"):
+            self.assertEqual(dispatcher.matching_handlers(
+                {"hook_event_name": "PreToolUse", "tool_name": tool_name}), [])
+
+    def test_tool_matcher_filters_post_tool_use(self):
+        scripts = dispatcher.matching_handlers({"hook_event_name": "PostToolUse", "tool_name": "Edit"})
+        self.assertIn("change-log.py", scripts)
+        self.assertNotIn("task-log.py", scripts)
+
+    def test_session_start_reaches_notify(self):
+        self.assertEqual(dispatcher.matching_handlers({"hook_event_name": "SessionStart"}),
+                         ["notify-ntfy.py"])
+
+    def test_every_handler_script_exists(self):
+        for _, _, script_name in dispatcher.HANDLERS:
+            self.assertTrue(os.path.isfile(os.path.join(HOOKS_DIR, script_name)), script_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Transcript Reader
+Shared helpers for reading Claude Code JSONL transcripts from hooks.
+
+Transcripts grow to hundreds of MB in long sessions, so the readers here seek
+from the end of the file in fixed-size blocks instead of loading every line.
+Callers that stop iterating early only pay for the tail they actually inspect.
+
+TranscriptIndex keeps a small file per transcript under the project's
+.claude/cache/transcript-index/ with the byte offsets of the records hooks
+look up most often, so repeated hook invocations only parse the bytes
+appended since the previous call. Claude's own transcript directory is never
+written to.
+read_transcript_context() builds on it to return the agent name, last user
+prompt and last todo list from a single pass over the transcript.
+"""
+
+import json
+import os
+import re
+import zlib
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Bytes read per backwards seek
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+# Index files live under <project>/.claude/cache/, like the security policy cache
+INDEX_DIR_NAME = 'transcript-index'
+INDEX_VERSION = 3
+
+# Bytes before the indexed EOF that must be unchanged for the index to be reused
+TAIL_CHECK_BYTES = 256
+
+# Agent mentions are only trusted within this many trailing transcript lines
+AGENT_WINDOW_LINES = 50
+
+AGENT_PATTERNS = [
+    re.compile(r'@([a-zA-Z-]+(?:-[a-zA-Z]+)*)', re.IGNORECASE),
+    re.compile(r'subagent:\s*([a-zA-Z-]+(?:-[a-zA-Z]+)*)', re.IGNORECASE),
+    re.compile(r'agent:\s*([a-zA-Z-]+(?:-[a-zA-Z]+)*)', re.IGNORECASE),
+    re.compile(r'using\s+([a-zA-Z-]+(?:-[a-zA-Z]+)*)\s+agent', re.IGNORECASE)
+]
+
+
+class TranscriptContext:
+    """Everything the task-log hooks need from a transcript."""
+
+    def __init__(self, agent_name: str = "main-agent", user_prompt: str = "No prompt found",
+                 todos: Optional[List[str]] = None, has_incomplete: bool = False):
+        self.agent_name = agent_name
+        self.user_prompt = user_prompt
+        self.todos = todos if todos is not None else []
+        self.has_incomplete = has_incomplete
+
+
+def iter_lines_reverse(transcript_path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[str]:
+    """Yield complete, non-blank lines of a file newest-first, reading backwards from EOF."""
+    with open(transcript_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+
+        # Chunks of the line currently being assembled, newest chunk first
+        pending: List[bytes] = []
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            parts = f.read(read_size).split(b'\n')
+
+            if len(parts) == 1:
+                # No newline in this block - the line continues further back
+                pending.append(parts[0])
+                continue
+
+            # The last part completes the line whose tail is already pending
+            lines = parts[1:-1] + [parts[-1] + b''.join(reversed(pending))]
+            pending = [parts[0]]
+
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode('utf-8', errors='replace')
+
+        first_line = b''.join(reversed(pending))
+        if first_line.strip():
+            yield first_line.decode('utf-8', errors='replace')
+
+
+def iter_records_reverse(transcript_path: str, max_lines: Optional[int] = None,
+                         block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[Dict]:
+    """
+    Yield parsed JSONL records newest-first.
+    Only the last max_lines lines are considered when a limit is given;
+    lines that are not valid JSON objects are skipped.
+    """
+    if not transcript_path or not os.path.exists(transcript_path):
+        return
+
+    lines = iter_lines_reverse(transcript_path, block_size)
+    if max_lines is not None:
+        lines = islice(lines, max_lines)
+
+    for line in lines:
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            yield data
+
+
+def is_todo_write_record(data: Dict) -> bool:
+    """Check if a record is an assistant message with a non-empty TodoWrite tool_use."""
+    if data.get('role') != 'assistant':
+        return False
+
+    content = data.get('content', [])
+    if not isinstance(content, list):
+        return False
+
+    for block in content:
+        if isinstance(block, dict) and block.get('type') == 'tool_use' and block.get('name') == 'TodoWrite':
+            if block.get('input', {}).get('todos', []):
+                return True
+
+    return False
+
+
+def is_user_prompt_record(data: Dict) -> bool:
+    """Check if a record is a user message with content."""
+    return data.get('role') == 'user' and bool(data.get('content', ''))
+
+
+def match_agent_name(data: Dict) -> Optional[str]:
+    """Return the agent named in an assistant message, if any."""
+    if data.get('role') != 'assistant':
+        return None
+
+    content = data.get('content', '')
+    if not isinstance(content, str):
+        return None
+
+    # Check for subagent patterns
+    if 'subagent' in content.lower() or '@' in content:
+        for pattern in AGENT_PATTERNS:
+            match = pattern.search(content)
+            if match:
+                return match.group(1).lower()
+
+    return None
+
+
+def clean_user_prompt(data: Optional[Dict]) -> str:
+    """Strip system reminders from a user record and truncate it for logging."""
+    content = data.get('content', '') if data else ''
+    if not content or not isinstance(content, str):
+        return "No prompt found"
+
+    # Clean up and truncate
+    content = content.strip()
+    # Remove system-reminder tags if present
+    if '<system-reminder>' in content:
+        # Extract just the user's actual prompt
+        parts = content.split('<system-reminder>')
+        content = parts[0].strip()
+
+    # Truncate to reasonable length
+    if len(content) > 150:
+        content = content[:147] + "..."
+
+    return content if content else "No prompt found"
+
+
+def parse_todo_record(data: Optional[Dict]) -> Tuple[List[str], bool]:
+    """Extract (tasks, has_incomplete) from the TodoWrite call in an assistant record."""
+    if not data:
+        return [], False
+
+    for block in data.get('content', []):
+        if isinstance(block, dict) and block.get('type') == 'tool_use' and block.get('name') == 'TodoWrite':
+            todos = block.get('input', {}).get('todos', [])
+            if not todos:
+                continue
+
+            tasks = []
+            has_incomplete = False
+
+            for todo in todos:
+                if isinstance(todo, dict):
+                    tasks.append(todo.get('content', todo.get('description', 'Unknown task')))
+                    if todo.get('status', 'pending').lower() != 'completed':
+                        has_incomplete = True
+
+            return tasks, has_incomplete
+
+    return [], False
+
+
+class TranscriptIndex:
+    """
+    Incremental byte-offset index for a transcript.
+
+    Stores the offset of the last TodoWrite tool_use, the last user prompt,
+    the last agent mention and the last EOF seen. refresh() only parses
+    records appended after that EOF. The index also records the transcript's
+    inode, mtime and size plus a checksum of the bytes just before EOF, so a
+    transcript that was replaced or rewritten is rescanned from the start.
+    """
+
+    def __init__(self, transcript_path: str, index_dir: Optional[str] = None):
+        self.transcript_path = transcript_path
+        self.index_path = get_index_path(transcript_path, index_dir)
+        self.inode: Optional[int] = None
+        self.mtime_ns: Optional[int] = None
+        self.tail_crc: Optional[int] = None
+        self.eof = 0
+        self.line_count = 0
+        self.last_todo_offset: Optional[int] = None
+        self.last_user_prompt_offset: Optional[int] = None
+        self.agent_name: Optional[str] = None
+        self.agent_line: Optional[int] = None
+        self._load()
+
+    def _load(self) -> None:
+        """Load a previously saved index, ignoring missing or stale files."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            return
+        if data.get('source') != self.transcript_path:
+            return
+
+        self.inode = data.get('inode')
+        self.mtime_ns = data.get('mtime_ns')
+        self.tail_crc = data.get('tail_crc')
+        self.eof = data.get('eof', 0)
+        self.line_count = data.get('line_count', 0)
+        self.last_todo_offset = data.get('last_todo_offset')
+        self.last_user_prompt_offset = data.get('last_user_prompt_offset')
+        self.agent_name = data.get('agent_name')
+        self.agent_line = data.get('agent_line')
+
+    def _save(self) -> None:
+        """Atomically write the index into the project cache."""
+        data = {
+            'version': INDEX_VERSION,
+            'source': self.transcript_path,
+            'inode': self.inode,
+            'mtime_ns': self.mtime_ns,
+            'tail_crc': self.tail_crc,
+            'eof': self.eof,
+            'line_count': self.line_count,
+            'last_todo_offset': self.last_todo_offset,
+            'last_user_prompt_offset': self.last_user_prompt_offset,
+            'agent_name': self.agent_name,
+            'agent_line': self.agent_line
+        }
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            # Index is only an optimization - fall back to rescanning next time
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _reset(self) -> None:
+        """Forget all offsets (transcript was truncated or replaced)."""
+        self.tail_crc = None
+        self.eof = 0
+        self.line_count = 0
+        self.last_todo_offset = None
+        self.last_user_prompt_offset = None
+        self.agent_name = None
+        self.agent_line = None
+
+    def refresh(self) -> None:
+        """Scan bytes appended since the last refresh and persist the index."""
+        with open(self.transcript_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self.inode or stat.st_size < self.eof:
+                self._reset()
+            elif stat.st_size == self.eof and stat.st_mtime_ns == self.mtime_ns:
+                return
+            elif self.tail_crc != read_tail_crc(f, self.eof):
+                # Same file, but the indexed bytes were rewritten in place
+                self._reset()
+
+            self.inode = stat.st_ino
+            self.mtime_ns = stat.st_mtime_ns
+            if stat.st_size == self.eof:
+                self._save()
+                return
+
+            offset = self.eof
+            line_count = self.line_count
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partial record still being written - pick it up next time
+                    break
+
+                # Cheap byte checks first so most lines never reach json.loads
+                maybe_agent = b'"assistant"' in line and (b'@' in line or b'subagent' in line.lower())
+                if maybe_agent or b'TodoWrite' in line or b'"user"' in line:
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        data = None
+
+                    if isinstance(data, dict):
+                        if is_todo_write_record(data):
+                            self.last_todo_offset = offset
+                        elif is_user_prompt_record(data):
+                            self.last_user_prompt_offset = offset
+                        elif maybe_agent:
+                            agent_name = match_agent_name(data)
+                            if agent_name:
+                                self.agent_name = agent_name
+                                self.agent_line = line_count
+
+                offset += len(line)
+                line_count += 1
+
+            self.eof = offset
+            self.line_count = line_count
+            self.tail_crc = read_tail_crc(f, offset)
+        self._save()
+
+    def read_record(self, offset: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Read and parse the single record starting at offset."""
+        if offset is None:
+            return None
+
+        try:
+            with open(self.transcript_path, 'rb') as f:
+                f.seek(offset)
+                data = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+        return data if isinstance(data, dict) else None
+
+    def current_agent_name(self, window: int = AGENT_WINDOW_LINES) -> Optional[str]:
+        """Return the last agent mentioned within the trailing window of lines."""
+        if self.agent_line is None or self.agent_line < self.line_count - window:
+            return None
+        return self.agent_name
+
+    def last_todo_record(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent assistant record containing a TodoWrite call."""
+        return self.read_record(self.last_todo_offset)
+
+    def last_user_prompt_record(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent user record."""
+        return self.read_record(self.last_user_prompt_offset)
+
+
+def get_index_path(transcript_path: str, index_dir: Optional[str] = None) -> str:
+    """Return the cache file holding a transcript's index."""
+    if index_dir is None:
+        project_dir = os.environ.get('CLAUDE_PROJECT_DIR', '.')
+        index_dir = os.path.join(project_dir, '.claude', 'cache', INDEX_DIR_NAME)
+    name = os.path.splitext(os.path.basename(transcript_path))[0]
+    path_crc = zlib.crc32(os.path.abspath(transcript_path).encode('utf-8'))
+    return os.path.join(index_dir, f"{name}-{path_crc:08x}.json")
+
+
+def read_tail_crc(f, eof: int) -> int:
+    """Checksum the TAIL_CHECK_BYTES of an open transcript that end at eof."""
+    start = max(0, eof - TAIL_CHECK_BYTES)
+    f.seek(start)
+    return zlib.crc32(f.read(eof - start))
+
+
+def load_transcript_index(transcript_path: str) -> Optional[TranscriptIndex]:
+    """Load and refresh the index for a transcript, or None if it doesn't exist."""
+    if not transcript_path or not os.path.exists(transcript_path):
+        return None
+
+    index = TranscriptIndex(transcript_path)
+    index.refresh()
+    return index
+
+
+def read_transcript_context(transcript_path: str) -> TranscriptContext:
+    """
+    Return agent name, last user prompt and last todo list in one pass.
+    Only newly appended bytes are parsed; the prompt and todo records are
+    then read directly at their indexed offsets.
+    """
+    context = TranscriptContext()
+
+    try:
+        index = load_transcript_index(transcript_path)
+        if not index:
+            return context
+
+        context.agent_name = index.current_agent_name() or context.agent_name
+        context.user_prompt = clean_user_prompt(index.last_user_prompt_record())
+        context.todos, context.has_incomplete = parse_todo_record(index.last_todo_record())
+    except Exception:
+        pass
+
+    return context
@@ -7,17 +7,126 @@ Can be used for Product Specs, Technical Specs, Design Specs, and API Specs.
 
 Usage:
     python validate-spec.py <spec-file.md> [--type product|technical|design|api]
+    python validate-spec.py --recursive <specs-dir> [--jobs N] [--type ...]
+
+Batch mode (--recursive) validates every spec markdown file under a directory
+in parallel worker processes and prints one aggregated report.
 
 Returns:
     Exit code 0: All validations passed
     Exit code 1: Validation failures found
 """
 
+import os
 import sys
 import re
 from pathlib import Path
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Set, Tuple
+from dataclasses import dataclass, field
+
+
+# Markdown files in a specs tree that are not specifications
+NON_SPEC_FILES = {'readme.md', 'changelog.md', 'skill.md'}
+
+VAGUE_TERMS = ['fast', 'slow', 'easy', 'simple', 'user-friendly', 'secure',
+               'performant', 'scalable', 'robust', 'flexible']
+
+
+# =============================================================================
+# Pre-compiled Regex Patterns
+# =============================================================================
+
+TITLE_PATTERN = re.compile(r'^#{1,2}\s+.+', re.MULTILINE)
+SECTION_PATTERN = re.compile(r'^#{2,3}\s+(.+)', re.MULTILINE)
+AUTH_TERM_PATTERN = re.compile(r'\b(auth(?:entication)?|login|sign[- ]?in)\b', re.IGNORECASE)
+DATE_FORMAT_PATTERN = re.compile(r'\d{1,4}[-/]\d{1,2}[-/]\d{1,4}')
+ISO_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}')
+
+
+# =============================================================================
+# Presence Rules
+# =============================================================================
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A presence check that fires when the document mentions something.
+
+    Without a pattern the rule fires if any keyword occurs. With a pattern the
+    keywords are a prefilter (at least one must occur for the pattern to
+    match) and the pattern decides. Case-insensitive rules are matched against
+    the document folded to lower case, so keywords and patterns are lower case.
+    """
+    name: str
+    keywords: Tuple[str, ...] = ()
+    pattern: Optional[str] = None
+    ignore_case: bool = True
+
+
+RULES = [
+    # Document structure
+    Rule('toc', ('table of contents',)),
+    # Clarity
+    Rule('examples', ('example', 'e.g.', 'for instance')),
+    Rule('measurable', pattern=r'\d+\s*(ms|seconds|%|percent|users|requests)'),
+    *[Rule(f'vague:{term}', (term,), rf'\b{term}\b(?!\s*\(|\s*:|\s*-)') for term in VAGUE_TERMS],
+    # Completeness
+    Rule('acceptance_criteria', ('acceptance criteria', 'success criteria')),
+    Rule('out_of_scope', ('out of scope', 'not included', 'excluded')),
+    Rule('dependencies', ('dependencies', 'depends on', 'requires')),
+    # Product
+    Rule('user_stories', ('i want',), r'as a .+ i want .+ so that'),
+    Rule('success_metrics', ('success metrics', 'kpi', 'key performance')),
+    Rule('personas', ('persona', 'user type', 'target user')),
+    # Technical
+    Rule('architecture', ('architecture', 'system design', 'component diagram')),
+    Rule('data_models', ('data model', 'schema', 'database', 'entity')),
+    Rule('error_handling', ('error handling', 'exception', 'failure')),
+    Rule('performance', ('performance', 'latency', 'throughput', 'response time')),
+    # Design
+    Rule('user_flows', ('user flow', 'journey', 'interaction flow')),
+    Rule('accessibility', ('accessibility', 'wcag', 'a11y', 'screen reader')),
+    Rule('responsive', ('responsive', 'mobile', 'tablet', 'breakpoint')),
+    Rule('states', ('state', 'hover', 'active', 'disabled', 'loading')),
+    # API
+    Rule('api_auth', ('authentication', 'authorization', 'api key', 'token')),
+    Rule('endpoints', ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'endpoint'), ignore_case=False),
+    Rule('error_codes', ('400', '401', '403', '404', '500', 'error code'), ignore_case=False),
+    Rule('rate_limiting', ('rate limit', 'throttl', 'quota')),
+    Rule('api_examples', ('```json', '```http', 'example request', 'example response')),
+]
+
+
+class RuleEngine:
+    """
+    Evaluates every rule against a document and returns the names that fired.
+
+    The document is case-folded once. Keywords are plain substring searches,
+    and patterns are compiled once per process and only run when their
+    prefilter keywords occur, so adding a rule adds a substring scan rather
+    than another case-insensitive regex pass.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self.patterns = {rule.name: re.compile(rule.pattern) for rule in rules if rule.pattern}
+
+    def evaluate(self, content: str) -> Set[str]:
+        folded = content.lower()
+        fired = set()
+
+        for rule in self.rules:
+            text = folded if rule.ignore_case else content
+            if rule.keywords and not any(keyword in text for keyword in rule.keywords):
+                continue
+            if rule.pattern and not self.patterns[rule.name].search(text):
+                continue
+            fired.add(rule.name)
+
+        return fired
+
+
+RULE_ENGINE = RuleEngine(RULES)
 
 
 @dataclass
@@ -29,6 +138,19 @@ class ValidationResult:
     message: str
 
 
+@dataclass
+class FileReport:
+    """Validation outcome for one file in batch mode"""
+    path: str
+    spec_type: str = 'unknown'
+    results: List[ValidationResult] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def passed(self) -> bool:
+        return not self.error and all(r.passed for r in self.results)
+
+
 class SpecValidator:
     """Validates specification documents"""
 
@@ -37,17 +159,11 @@ class SpecValidator:
         self.spec_type = spec_type or self._detect_spec_type()
         self.content = self._read_file()
         self.results: List[ValidationResult] = []
+        self.fired: Set[str] = set()
 
     def _read_file(self) -> str:
-        """Read specification file"""
-        try:
-            return self.file_path.read_text(encoding='utf-8')
-        except FileNotFoundError:
-            print(f"Error: File not found: {self.file_path}")
-            sys.exit(1)
-        except Exception as e:
-            print(f"Error reading file: {e}")
-            sys.exit(1)
+        """Read specification file (raises FileNotFoundError / OSError / UnicodeDecodeError)"""
+        return self.file_path.read_text(encoding='utf-8')
 
     def _detect_spec_type(self) -> str:
         """Detect specification type from filename or content"""
@@ -70,6 +186,14 @@ class SpecValidator:
         print(f"Validating {self.spec_type.upper()} specification: {self.file_path.name}")
         print(f"{'='*60}\n")
 
+        self.run_checks()
+        return self._print_results()
+
+    def run_checks(self) -> List[ValidationResult]:
+        """Run all validations without printing and return the results"""
+        self.results = []
+        self.fired = RULE_ENGINE.evaluate(self.content)
+
         # Common validations
         self._validate_document_structure()
         self._validate_clarity()
@@ -86,7 +210,7 @@ class SpecValidator:
         elif self.spec_type == 'api':
             self._validate_api_spec()
 
-        return self._print_results()
+        return self.results
 
     def _add_result(self, category: str, check: str, passed: bool, message: str = ""):
         """Add validation result"""
@@ -97,7 +221,7 @@ class SpecValidator:
         category = "Document Structure"
 
         # Check for title/heading
-        has_title = bool(re.search(r'^#{1,2}\s+.+', self.content, re.MULTILINE))
+        has_title = bool(TITLE_PATTERN.search(self.content))
         self._add_result(
             category,
             "Has main title",
@@ -106,7 +230,7 @@ class SpecValidator:
         )
 
         # Check for sections
-        sections = re.findall(r'^#{2,3}\s+(.+)', self.content, re.MULTILINE)
+        sections = SECTION_PATTERN.findall(self.content)
         has_sections = len(sections) >= 3
         self._add_result(
             category,
@@ -118,7 +242,7 @@ class SpecValidator:
         # Check for table of contents (optional but recommended for long docs)
         lines = self.content.split('\n')
         word_count = len(self.content.split())
-        has_toc = 'table of contents' in self.content.lower()
+        has_toc = 'toc' in self.fired
 
         if word_count > 1000 and not has_toc:
             self._add_result(
@@ -132,16 +256,8 @@ class SpecValidator:
         """Validate clarity of specification"""
         category = "Clarity"
 
-        # Check for vague terms
-        vague_terms = ['fast', 'slow', 'easy', 'simple', 'user-friendly', 'secure',
-                       'performant', 'scalable', 'robust', 'flexible']
-        found_vague = []
-
-        for term in vague_terms:
-            # Look for standalone vague terms (not as part of specific measurements)
-            pattern = rf'\b{term}\b(?!\s*\(|\s*:|\s*-)'
-            if re.search(pattern, self.content, re.IGNORECASE):
-                found_vague.append(term)
+        # Check for vague terms (standalone, not as part of specific measurements)
+        found_vague = [term for term in VAGUE_TERMS if f'vague:{term}' in self.fired]
 
         no_vague_terms = len(found_vague) == 0
         self._add_result(
@@ -152,7 +268,7 @@ class SpecValidator:
         )
 
         # Check for examples
-        has_examples = bool(re.search(r'example|e\.g\.|for instance', self.content, re.IGNORECASE))
+        has_examples = 'examples' in self.fired
         self._add_result(
             category,
             "Includes examples",
@@ -161,7 +277,7 @@ class SpecValidator:
         )
 
         # Check for specific numbers/measurements
-        has_metrics = bool(re.search(r'\d+\s*(ms|seconds|%|percent|users|requests)', self.content, re.IGNORECASE))
+        has_metrics = 'measurable' in self.fired
         self._add_result(
             category,
             "Includes measurable criteria",
@@ -174,7 +290,7 @@ class SpecValidator:
         category = "Completeness"
 
         # Check for acceptance criteria
-        has_acceptance = bool(re.search(r'acceptance criteria|success criteria', self.content, re.IGNORECASE))
+        has_acceptance = 'acceptance_criteria' in self.fired
         self._add_result(
             category,
             "Defines acceptance criteria",
@@ -183,7 +299,7 @@ class SpecValidator:
         )
 
         # Check for out of scope section
-        has_out_of_scope = bool(re.search(r'out of scope|not included|excluded', self.content, re.IGNORECASE))
+        has_out_of_scope = 'out_of_scope' in self.fired
         self._add_result(
             category,
             "Defines out of scope items",
@@ -192,7 +308,7 @@ class SpecValidator:
         )
 
         # Check for dependencies
-        has_dependencies = bool(re.search(r'dependencies|depends on|requires', self.content, re.IGNORECASE))
+        has_dependencies = 'dependencies' in self.fired
         self._add_result(
             category,
             "Lists dependencies",
@@ -206,7 +322,7 @@ class SpecValidator:
 
         # Check for consistent terminology
         # Look for multiple terms for same concept
-        auth_terms = len(set(re.findall(r'\b(auth(?:entication)?|login|sign[- ]?in)\b', self.content, re.IGNORECASE)))
+        auth_terms = len(set(AUTH_TERM_PATTERN.findall(self.content)))
         if auth_terms > 1:
             self._add_result(
                 category,
@@ -216,8 +332,8 @@ class SpecValidator:
             )
 
         # Check date format consistency
-        date_formats = set(re.findall(r'\d{1,4}[-/]\d{1,2}[-/]\d{1,4}', self.content))
-        iso_dates = set(re.findall(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}', self.content))
+        date_formats = set(DATE_FORMAT_PATTERN.findall(self.content))
+        iso_dates = set(ISO_DATE_PATTERN.findall(self.content))
 
         inconsistent_dates = len(date_formats) > 3 and len(iso_dates) == 0
         self._add_result(
@@ -232,7 +348,7 @@ class SpecValidator:
         category = "Product Spec"
 
         # Check for user stories
-        has_user_stories = bool(re.search(r'as a .+ i want .+ so that', self.content, re.IGNORECASE))
+        has_user_stories = 'user_stories' in self.fired
         self._add_result(
             category,
             "Includes user stories",
@@ -241,7 +357,7 @@ class SpecValidator:
         )
 
         # Check for success metrics
-        has_metrics = bool(re.search(r'success metrics|kpi|key performance', self.content, re.IGNORECASE))
+        has_metrics = 'success_metrics' in self.fired
         self._add_result(
             category,
             "Defines success metrics",
@@ -250,7 +366,7 @@ class SpecValidator:
         )
 
         # Check for user personas
-        has_personas = bool(re.search(r'persona|user type|target user', self.content, re.IGNORECASE))
+        has_personas = 'personas' in self.fired
         self._add_result(
             category,
             "Defines user personas",
@@ -263,7 +379,7 @@ class SpecValidator:
         category = "Technical Spec"
 
         # Check for architecture section
-        has_architecture = bool(re.search(r'architecture|system design|component diagram', self.content, re.IGNORECASE))
+        has_architecture = 'architecture' in self.fired
         self._add_result(
             category,
             "Includes architecture description",
@@ -272,7 +388,7 @@ class SpecValidator:
         )
 
         # Check for data models
-        has_data_models = bool(re.search(r'data model|schema|database|entity', self.content, re.IGNORECASE))
+        has_data_models = 'data_models' in self.fired
         self._add_result(
             category,
             "Defines data models",
@@ -281,7 +397,7 @@ class SpecValidator:
         )
 
         # Check for error handling
-        has_error_handling = bool(re.search(r'error handling|exception|failure', self.content, re.IGNORECASE))
+        has_error_handling = 'error_handling' in self.fired
         self._add_result(
             category,
             "Addresses error handling",
@@ -290,7 +406,7 @@ class SpecValidator:
         )
 
         # Check for performance requirements
-        has_performance = bool(re.search(r'performance|latency|throughput|response time', self.content, re.IGNORECASE))
+        has_performance = 'performance' in self.fired
         self._add_result(
             category,
             "Specifies performance requirements",
@@ -303,7 +419,7 @@ class SpecValidator:
         category = "Design Spec"
 
         # Check for user flows
-        has_flows = bool(re.search(r'user flow|journey|interaction flow', self.content, re.IGNORECASE))
+        has_flows = 'user_flows' in self.fired
         self._add_result(
             category,
             "Includes user flows",
@@ -312,7 +428,7 @@ class SpecValidator:
         )
 
         # Check for accessibility
-        has_accessibility = bool(re.search(r'accessibility|wcag|a11y|screen reader', self.content, re.IGNORECASE))
+        has_accessibility = 'accessibility' in self.fired
         self._add_result(
             category,
             "Addresses accessibility",
@@ -321,7 +437,7 @@ class SpecValidator:
         )
 
         # Check for responsive design
-        has_responsive = bool(re.search(r'responsive|mobile|tablet|breakpoint', self.content, re.IGNORECASE))
+        has_responsive = 'responsive' in self.fired
         self._add_result(
             category,
             "Addresses responsive design",
@@ -330,7 +446,7 @@ class SpecValidator:
         )
 
         # Check for component states
-        has_states = bool(re.search(r'state|hover|active|disabled|loading', self.content, re.IGNORECASE))
+        has_states = 'states' in self.fired
         self._add_result(
             category,
             "Defines component states",
@@ -343,7 +459,7 @@ class SpecValidator:
         category = "API Spec"
 
         # Check for authentication
-        has_auth = bool(re.search(r'authentication|authorization|api key|token', self.content, re.IGNORECASE))
+        has_auth = 'api_auth' in self.fired
         self._add_result(
             category,
             "Specifies authentication",
@@ -352,7 +468,7 @@ class SpecValidator:
         )
 
         # Check for endpoints
-        has_endpoints = bool(re.search(r'GET|POST|PUT|PATCH|DELETE|endpoint', self.content))
+        has_endpoints = 'endpoints' in self.fired
         self._add_result(
             category,
             "Documents endpoints",
@@ -361,7 +477,7 @@ class SpecValidator:
         )
 
         # Check for error codes
-        has_error_codes = bool(re.search(r'400|401|403|404|500|error code', self.content))
+        has_error_codes = 'error_codes' in self.fired
         self._add_result(
             category,
             "Defines error codes",
@@ -370,7 +486,7 @@ class SpecValidator:
         )
 
         # Check for rate limiting
-        has_rate_limit = bool(re.search(r'rate limit|throttl|quota', self.content, re.IGNORECASE))
+        has_rate_limit = 'rate_limiting' in self.fired
         self._add_result(
             category,
             "Addresses rate limiting",
@@ -379,7 +495,7 @@ class SpecValidator:
         )
 
         # Check for request/response examples
-        has_examples = bool(re.search(r'```json|```http|example request|example response', self.content, re.IGNORECASE))
+        has_examples = 'api_examples' in self.fired
         self._add_result(
             category,
             "Includes request/response examples",
@@ -429,6 +545,80 @@ class SpecValidator:
             return False
 
 
+def find_spec_files(root: Path) -> List[Path]:
+    """All spec markdown files under root, skipping hidden directories"""
+    spec_files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(d for d in dir_names if not d.startswith('.'))
+        for name in sorted(file_names):
+            if name.lower().endswith('.md') and name.lower() not in NON_SPEC_FILES:
+                spec_files.append(Path(dir_path) / name)
+    return spec_files
+
+
+def validate_file(path: str, spec_type: Optional[str] = None) -> FileReport:
+    """Validate one file without printing (runs in a worker process)"""
+    report = FileReport(path)
+    try:
+        validator = SpecValidator(path, spec_type)
+        report.spec_type = validator.spec_type
+        report.results = validator.run_checks()
+    except Exception as e:
+        report.error = f"{e.__class__.__name__}: {e}"
+    return report
+
+
+def validate_tree(root: Path, spec_type: Optional[str] = None, jobs: Optional[int] = None) -> List[FileReport]:
+    """Validate every spec under root across worker processes, in path order"""
+    paths = [str(path) for path in find_spec_files(root)]
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+
+    if jobs <= 1:
+        # Not worth starting a pool
+        return [validate_file(path, spec_type) for path in paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Batch files per task so small specs do not pay one round trip each
+        chunksize = max(1, len(paths) // (jobs * 4))
+        return list(pool.map(validate_file, paths, [spec_type] * len(paths), chunksize=chunksize))
+
+
+def print_batch_report(root: Path, reports: List[FileReport]) -> bool:
+    """Print one aggregated report for a batch run and return overall pass/fail"""
+    green, red, reset = "\033[92m", "\033[91m", "\033[0m"
+
+    print(f"\n{'='*60}")
+    print(f"Validating {len(reports)} specification(s) under {root}")
+    print(f"{'='*60}\n")
+
+    for report in reports:
+        name = os.path.relpath(report.path, root)
+        if report.error:
+            print(f"{red}✗{reset} {name}: {report.error}")
+            continue
+
+        passed_checks = sum(1 for r in report.results if r.passed)
+        status = f"{green}✓{reset}" if report.passed else f"{red}✗{reset}"
+        print(f"{status} {name} ({report.spec_type}): {passed_checks}/{len(report.results)} checks passed")
+
+        for result in report.results:
+            if not result.passed:
+                print(f"    ✗ {result.category}: {result.check}")
+
+    passed_files = sum(1 for report in reports if report.passed)
+    failed_checks = sum(1 for report in reports for r in report.results if not r.passed)
+    errors = sum(1 for report in reports if report.error)
+
+    print(f"\n{'='*60}")
+    print(f"SUMMARY: {passed_files}/{len(reports)} specifications passed, "
+          f"{failed_checks} failed check(s), {errors} unreadable file(s)")
+    print(f"{'='*60}\n")
+
+    return passed_files == len(reports)
+
+
 def main():
     """Main entry point"""
     import argparse
@@ -438,6 +628,7 @@ def main():
     )
     parser.add_argument(
         "file",
+        nargs="?",
         help="Path to specification file (.md)"
     )
     parser.add_argument(
@@ -445,10 +636,39 @@ def main():
         choices=["product", "technical", "design", "api"],
         help="Specification type (auto-detected if not provided)"
     )
+    parser.add_argument(
+        "--recursive",
+        metavar="DIR",
+        help="Validate every spec markdown file under DIR in parallel"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Worker processes for --recursive (default: CPU count)"
+    )
 
     args = parser.parse_args()
 
-    validator = SpecValidator(args.file, args.type)
+    if bool(args.file) == bool(args.recursive):
+        parser.error("give either a spec file or --recursive DIR")
+
+    if args.recursive:
+        root = Path(args.recursive)
+        if not root.is_dir():
+            print(f"Error: Directory not found: {root}")
+            sys.exit(1)
+        reports = validate_tree(root, args.type, args.jobs)
+        sys.exit(0 if print_batch_report(root, reports) else 1)
+
+    try:
+        validator = SpecValidator(args.file, args.type)
+    except FileNotFoundError:
+        print(f"Error: File not found: {args.file}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        sys.exit(1)
+
     all_passed = validator.validate()
 
     sys.exit(0 if all_passed else 1)